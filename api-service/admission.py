@@ -0,0 +1,104 @@
+# admission.py
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being admitted."""
+
+    def __init__(self, endpoint: str, status_code: int, retry_after: int, reason: str) -> None:
+        super().__init__(f"{endpoint}: {reason}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, deadline-aware wait queue for one endpoint.
+
+    At most `max_concurrent` requests run at once. Up to `max_queue` more may wait
+    for a slot for at most `queue_timeout` seconds. Anything beyond that is shed
+    immediately with 429; a request whose wait deadline expires gets 503.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: int = 1,
+    ) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1.")
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._counters = {
+            "admitted": 0,
+            "queued_total": 0,
+            "shed_queue_full": 0,
+            "shed_timeout": 0,
+        }
+
+    def _acquire(self) -> None:
+        with self._cond:
+            if self._in_flight < self.max_concurrent and self._queued == 0:
+                self._in_flight += 1
+                self._counters["admitted"] += 1
+                return
+
+            if self._queued >= self.max_queue:
+                self._counters["shed_queue_full"] += 1
+                raise AdmissionRejected(self.name, 429, self.retry_after, "too many queued requests")
+
+            self._queued += 1
+            self._counters["queued_total"] += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self._in_flight >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["shed_timeout"] += 1
+                        raise AdmissionRejected(self.name, 503, self.retry_after, "timed out waiting for capacity")
+                    self._cond.wait(remaining)
+            finally:
+                self._queued -= 1
+
+            self._in_flight += 1
+            self._counters["admitted"] += 1
+
+    def _release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                **self._counters,
+            }
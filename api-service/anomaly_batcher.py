@@ -0,0 +1,154 @@
+# anomaly_batcher.py
+
+import threading
+import time
+import concurrent.futures
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent requests and scores them together.
+
+    A batch is dispatched when it reaches `max_batch_size` items or when its
+    oldest item has waited `max_wait_seconds`, whichever comes first. Up to
+    `max_in_flight` batches are scored concurrently. `score_batch` receives the
+    list of items and must return one result per item, in order.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 500,
+        max_wait_seconds: float = 0.25,
+        max_in_flight: int = 2,
+        name: str = "batcher",
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._pending = deque()  # (item, future, enqueued_at)
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._stats = {
+            "items": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "max_batch_size_seen": 0,
+            "abandoned_items": 0,
+        }
+        self._wait_ms = deque(maxlen=1000)
+        self._score_ms = deque(maxlen=1000)
+        self._thread = threading.Thread(target=self._dispatch_loop, name=f"{name}-dispatch", daemon=True)
+        self._thread.start()
+
+    def submit(self, items: List[Any], timeout: float) -> List[Any]:
+        """
+        Enqueue `items` and block until all are scored.
+
+        Raises concurrent.futures.TimeoutError (not the builtin TimeoutError
+        before Python 3.11) after `timeout` seconds; the request's items that
+        are still queued are then dropped instead of being scored for nobody.
+        """
+        futures = []
+        now = time.monotonic()
+        with self._cond:
+            for item in items:
+                fut = concurrent.futures.Future()
+                self._pending.append((item, fut, now))
+                futures.append(fut)
+            self._cond.notify()
+        deadline = now + timeout
+        try:
+            return [fut.result(timeout=max(0.0, deadline - time.monotonic())) for fut in futures]
+        except concurrent.futures.TimeoutError:
+            self._abandon(futures)
+            raise
+
+    def _abandon(self, futures: List[concurrent.futures.Future]) -> None:
+        # Only futures not yet taken into a batch can be cancelled
+        with self._cond:
+            cancelled = sum(fut.cancel() for fut in futures)
+            if cancelled:
+                self._pending = deque(entry for entry in self._pending if not entry[1].cancelled())
+                self._stats["abandoned_items"] += cancelled
+
+    def _next_batch(self) -> list:
+        with self._cond:
+            while True:
+                if self._pending:
+                    age = time.monotonic() - self._pending[0][2]
+                    if len(self._pending) >= self.max_batch_size or age >= self.max_wait_seconds:
+                        size = min(len(self._pending), self.max_batch_size)
+                        batch = [self._pending.popleft() for _ in range(size)]
+                        # Marks the futures running, so a late timeout can no longer cancel them
+                        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+                        if batch:
+                            return batch
+                        continue
+                    self._cond.wait(self.max_wait_seconds - age)
+                else:
+                    self._cond.wait()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            # Holding a slot before forming the batch lets items keep accumulating
+            # while all scorers are busy, so saturation produces bigger batches
+            self._slots.acquire()
+            batch = self._next_batch()
+            self._pool.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: list) -> None:
+        started = time.monotonic()
+        try:
+            with self._cond:
+                self._wait_ms.extend((started - enqueued_at) * 1000 for _, _, enqueued_at in batch)
+            try:
+                results = self.score_batch([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"scorer returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                with self._cond:
+                    self._stats["failed_batches"] += 1
+                for _, fut, _ in batch:
+                    fut.set_exception(e)
+                return
+            for (_, fut, _), result in zip(batch, results):
+                fut.set_result(result)
+            with self._cond:
+                self._stats["items"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], len(batch))
+        finally:
+            with self._cond:
+                self._score_ms.append((time.monotonic() - started) * 1000)
+            self._slots.release()
+
+    @staticmethod
+    def _quantile(samples: list, q: float):
+        ordered = sorted(samples)
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queued"] = len(self._pending)
+            wait_ms, score_ms = list(self._wait_ms), list(self._score_ms)
+        stats.update({
+            "max_batch_size": self.max_batch_size,
+            "max_wait_seconds": self.max_wait_seconds,
+            "avg_batch_size": round(stats["items"] / stats["batches"], 2) if stats["batches"] else None,
+            "queue_wait_p50_ms": self._quantile(wait_ms, 0.50),
+            "queue_wait_p99_ms": self._quantile(wait_ms, 0.99),
+            "score_p50_ms": self._quantile(score_ms, 0.50),
+            "score_p99_ms": self._quantile(score_ms, 0.99),
+        })
+        return stats
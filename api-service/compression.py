@@ -0,0 +1,36 @@
+# compression.py
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+
+# Media types worth gzipping. Arrow IPC and zstd-compressed Parquet exports
+# gain little or nothing and would only cost CPU
+COMPRESSIBLE_MEDIA_TYPES = {"application/json", "application/x-ndjson"}
+
+
+class _MediaTypeGZipResponder(GZipResponder):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.passthrough = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            media_type = Headers(raw=message["headers"]).get("content-type", "").split(";")[0].strip()
+            self.passthrough = media_type not in COMPRESSIBLE_MEDIA_TYPES
+        if self.passthrough:
+            await self.send(message)
+            return
+        await super().send_with_gzip(message)
+
+
+class MediaTypeGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves responses outside COMPRESSIBLE_MEDIA_TYPES untouched."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _MediaTypeGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
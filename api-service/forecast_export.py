@@ -0,0 +1,108 @@
+# forecast_export.py
+
+from typing import Iterable, Iterator, List
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Used when the forecast comes back empty, so clients still get a valid file
+EMPTY_FORECAST_SCHEMA = pa.schema([
+    ("forecast_timestamp", pa.timestamp("us", tz="UTC")),
+    ("forecast_value", pa.float64()),
+    ("standard_error", pa.float64()),
+    ("confidence_level", pa.float64()),
+    ("prediction_interval_lower_bound", pa.float64()),
+    ("prediction_interval_upper_bound", pa.float64()),
+])
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back out in chunks."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _peek(batches: Iterable[pa.RecordBatch]):
+    it = iter(batches)
+    for batch in it:
+        return batch.schema, batch, it
+    return EMPTY_FORECAST_SCHEMA, None, iter(())
+
+
+def stream_arrow_ipc(batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    schema, first, rest = _peek(batches)
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield sink.drain()
+        if first is not None:
+            writer.write_batch(first)
+            yield sink.drain()
+            for batch in rest:
+                writer.write_batch(batch)
+                yield sink.drain()
+    yield sink.drain()
+
+
+def stream_parquet(batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    schema, first, rest = _peek(batches)
+    sink = _ChunkSink()
+    # One row group per incoming page keeps memory bounded by the page size
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        if first is not None:
+            writer.write_batch(first)
+            yield sink.drain()
+            for batch in rest:
+                writer.write_batch(batch)
+                yield sink.drain()
+    yield sink.drain()
+
+
+def stream_ndjson(batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+        # Serialized column-wise by pandas, not via a Python dict per row
+        text = batch.to_pandas().to_json(orient="records", lines=True, date_format="iso")
+        yield text.encode("utf-8") if text.endswith("\n") else (text + "\n").encode("utf-8")
+
+
+STREAMERS = {
+    "ndjson": stream_ndjson,
+    "arrow": stream_arrow_ipc,
+    "parquet": stream_parquet,
+}
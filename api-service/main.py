@@ -1,10 +1,22 @@
 import os
+import time
+import hashlib
 import datetime
-from typing import Optional
-from fastapi import FastAPI
-from pydantic import BaseModel, Field, validator
-from forecast_core import ForecastCore
+import threading
+import concurrent.futures
+from typing import List, Optional, Union
+import pandas as pd
+import pyarrow as pa
+from fastapi import FastAPI, Request, Response, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, validator, ValidationError
+from forecast_core import ForecastCore, AGGREGATIONS, FORECAST_MAX_HORIZON, rollup_forecast
 from forecast_core import BQMLTrainer
+from admission import AdmissionController, AdmissionRejected
+from logic_components.query_executor import QueryTimeout, is_transient
+from forecast_export import MEDIA_TYPES, STREAMERS
+from compression import MediaTypeGZipMiddleware
+from anomaly_batcher import MicroBatcher
 from google.auth.exceptions import DefaultCredentialsError
 from fastapi.staticfiles import StaticFiles
 
@@ -20,25 +32,60 @@ api = FastAPI(
     title="Taxi Demand Forecasting API",
     version="1.0.0"
 )
+# Compress large JSON / NDJSON bodies (full-horizon forecasts); small ones and
+# binary exports (Arrow, Parquet) are sent as-is
+api.add_middleware(MediaTypeGZipMiddleware, minimum_size=1024)
 
 PROJECT_ID = os.getenv("PROJECT_ID", "ml-ai-portfolio")
 DATASET_ID = os.getenv("DATASET_ID", "taxi_forecasting")
 MODEL_PATH = os.getenv("MODEL_PATH",
     "ml-ai-portfolio.taxi_forecasting.daily_arima_default_model_v1")
+# How long a looked-up model version (and therefore a forecast ETag) is trusted
+# before we ask BigQuery again; also used as the Cache-Control max-age.
+MODEL_VERSION_TTL_SECONDS = int(os.getenv("MODEL_VERSION_TTL_SECONDS", "60"))
+
+# ============================
+# Admission control
+# ============================
+# These bound the number of concurrent ML.FORECAST / CREATE MODEL jobs this
+# instance can start. Forecast cache hits also run inside a slot (they are
+# cheap and release it quickly), so the limit is on requests, not jobs.
+forecast_admission = AdmissionController(
+    "forecast",
+    max_concurrent=int(os.getenv("FORECAST_MAX_CONCURRENT", "8")),
+    max_queue=int(os.getenv("FORECAST_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("FORECAST_QUEUE_TIMEOUT_SECONDS", "5")),
+    retry_after=int(os.getenv("FORECAST_RETRY_AFTER_SECONDS", "2")),
+)
+retrain_admission = AdmissionController(
+    "retrain",
+    max_concurrent=int(os.getenv("RETRAIN_MAX_CONCURRENT", "1")),
+    max_queue=int(os.getenv("RETRAIN_MAX_QUEUE", "0")),
+    queue_timeout=float(os.getenv("RETRAIN_QUEUE_TIMEOUT_SECONDS", "0")),
+    retry_after=int(os.getenv("RETRAIN_RETRY_AFTER_SECONDS", "60")),
+)
+
+_model_version_lock = threading.Lock()
+_model_version_cache = {"version": None, "fetched_at": 0.0, "inflight": None}
 
 
 class ForecastRequest(BaseModel):
     start_date: str
-    horizon: int = Field(..., ge=1, le=30)
+    horizon: int = Field(..., ge=1)
+    # "day" returns daily points; "week" / "month" return calendar rollups
+    aggregation: str = "day"
+
+    @validator("aggregation")
+    def validate_aggregation(cls, v):
+        if v != "day" and v not in AGGREGATIONS:
+            raise ValueError(f"aggregation must be one of {['day'] + sorted(AGGREGATIONS)}")
+        return v
 
     @validator("start_date")
     def validate_date(cls, v):
-        # Validate format and ensure date is within November 2022
-        d = datetime.datetime.strptime(v, "%Y-%m-%d").date()
-        min_date = datetime.date(2022, 11, 1)
-        max_date = datetime.date(2022, 11, 30)
-        if d < min_date or d > max_date:
-            raise ValueError("start_date must be within November 2022 (2022-11-01 to 2022-11-30)")
+        # Format only; the valid range depends on the served model (ForecastCore.forecast_window).
+        # Hourly models also accept YYYY-MM-DDTHH:MM.
+        datetime.datetime.fromisoformat(v)
         return v
 
 
@@ -48,34 +95,142 @@ class ForecastResponse(BaseModel):
     error: str | None = None
 
 
+@api.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"status": "error", "error": f"Service saturated: {exc.reason}", "endpoint": exc.endpoint},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @api.get("/health")
 def health_check():
     return {"status": "ok", "project_id": PROJECT_ID}
 
 
+@api.get("/admission")
+def admission_stats():
+    return {
+        "forecast": forecast_admission.stats(),
+        "retrain": retrain_admission.stats(),
+    }
+
+
+def _shed_if_warehouse_saturated(exc: Exception, controller: AdmissionController) -> None:
+    """
+    BigQuery throttling, backend unavailability and deadline overruns that
+    survived the executor's retries are overload, not bad input: answer them
+    like local shedding (503 + Retry-After) instead of a 200 with an error.
+    """
+    if isinstance(exc, QueryTimeout) or is_transient(exc):
+        raise AdmissionRejected(
+            controller.name, 503, controller.retry_after, f"BigQuery is saturated ({type(exc).__name__}: {exc})"
+        ) from exc
+
+
+def _is_mock_mode() -> bool:
+    return os.getenv("MOCK_FORECAST", "false").lower() in ("1", "true", "yes")
+
+
+def _get_model_version() -> str:
+    """Return the current model version, refreshed at most every MODEL_VERSION_TTL_SECONDS."""
+    if _is_mock_mode():
+        return "mock"
+    # The catalog call runs with no lock held; concurrent refreshes share one call
+    with _model_version_lock:
+        age = time.monotonic() - _model_version_cache["fetched_at"]
+        if _model_version_cache["version"] is not None and age <= MODEL_VERSION_TTL_SECONDS:
+            return _model_version_cache["version"]
+        inflight = _model_version_cache["inflight"]
+        if inflight is None:
+            _model_version_cache["inflight"] = concurrent.futures.Future()
+    if inflight is not None:
+        return inflight.result()
+
+    try:
+        version = ForecastCore(MODEL_PATH, PROJECT_ID).model_version()
+    except BaseException as e:
+        with _model_version_lock:
+            _model_version_cache["inflight"].set_exception(e)
+            _model_version_cache["inflight"] = None
+        raise
+    with _model_version_lock:
+        _model_version_cache.update(version=version, fetched_at=time.monotonic())
+        _model_version_cache["inflight"].set_result(version)
+        _model_version_cache["inflight"] = None
+    return version
+
+
+def _forecast_etag(model_version: str, start_date: str, horizon: int, aggregation: str = "day") -> str:
+    key = f"{MODEL_PATH}|{model_version}|{start_date}|{horizon}|{aggregation}"
+    # Weak validator: the body may be gzip-encoded, so it is not byte-identical
+    return 'W/"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison (RFC 7232): W/"x" matches "x"
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    candidates = [opaque(c) for c in if_none_match.split(",")]
+    return "*" in candidates or opaque(etag) in candidates
+
+
 @api.post("/forecast", response_model=ForecastResponse)
 def forecast(request: ForecastRequest):
+    with forecast_admission.slot():
+        return _run_forecast(request)
+
+
+def _invalid_forecast_request(message: str) -> JSONResponse:
+    # Same body shape as a successful response, so clients read `error` either way
+    return JSONResponse(status_code=422, content=ForecastResponse(meta={}, data=[], error=message).dict())
+
+
+def _run_forecast(request: ForecastRequest) -> Union[ForecastResponse, JSONResponse]:
     # Mock mode: return deterministic sample data for local UI testing
-    mock_mode = os.getenv("MOCK_FORECAST", "false").lower() in ("1", "true", "yes")
+    mock_mode = _is_mock_mode()
     if mock_mode:
+        if request.horizon > FORECAST_MAX_HORIZON:
+            return _invalid_forecast_request(f"horizon must be at most {FORECAST_MAX_HORIZON}.")
         # Simple 3-day horizon example starting at start_date
-        start_date = datetime.datetime.strptime(request.start_date, "%Y-%m-%d").date()
+        start_date = datetime.datetime.fromisoformat(request.start_date).date()
         results = []
         for i in range(request.horizon):
             dt = start_date + datetime.timedelta(days=i)
             results.append({"date": dt.isoformat(), "forecast": float(100 + i)})
-        return ForecastResponse(meta={"model": MODEL_PATH, "start_date": request.start_date}, data=results)
+        if request.aggregation != "day":
+            daily = pd.DataFrame({
+                "forecast_timestamp": pd.to_datetime([r["date"] for r in results]),
+                "forecast_value": [r["forecast"] for r in results],
+            })
+            daily["prediction_interval_lower_bound"] = daily["forecast_value"] * 0.9
+            daily["prediction_interval_upper_bound"] = daily["forecast_value"] * 1.1
+            results = rollup_forecast(daily, request.aggregation)
+        return ForecastResponse(meta={"model": MODEL_PATH, "start_date": request.start_date,
+                                      "aggregation": request.aggregation}, data=results)
     try:
         fc = ForecastCore(MODEL_PATH, PROJECT_ID)
-        results = fc.forecast(request.start_date, request.horizon)
+        version = _get_model_version()
+        if request.aggregation == "day":
+            results = fc.forecast(request.start_date, request.horizon, model_version=version)
+        else:
+            results = fc.rollup(request.start_date, request.horizon, request.aggregation, model_version=version)
         # Build meta with last_query_stats to help the UI show why empty
-        meta = {"model": MODEL_PATH, "start_date": request.start_date}
+        meta = {"model": MODEL_PATH, "start_date": request.start_date, "aggregation": request.aggregation}
         try:
             if hasattr(fc, "last_query_stats") and fc.last_query_stats:
                 meta.update(fc.last_query_stats)
         except Exception:
             pass
         return ForecastResponse(meta=meta, data=results)
+    except ValueError as e:
+        # Outside the model's forecast window; rejected before ML.FORECAST runs
+        return _invalid_forecast_request(str(e))
     except DefaultCredentialsError as e:
         # Make this explicit and helpful to users testing locally without ADC
         return ForecastResponse(meta={}, data=[], error=(
@@ -84,33 +239,256 @@ def forecast(request: ForecastRequest):
             f"Original error: {e}"
         ))
     except Exception as e:
+        _shed_if_warehouse_saturated(e, forecast_admission)
         # Ensure we always return a JSON body the client can parse
         return ForecastResponse(meta={}, data=[], error=str(e))
 
 
+@api.get("/forecast", response_model=ForecastResponse)
+def forecast_cached(
+    http_request: Request,
+    response: Response,
+    start_date: str,
+    horizon: int = Query(...),
+    aggregation: str = Query("day"),
+):
+    """
+    Cacheable variant of POST /forecast.
+
+    The ETag is derived from the model version and the request parameters, so a
+    poller sending If-None-Match gets a 304 without ML.FORECAST being run again.
+    """
+    try:
+        request = ForecastRequest(start_date=start_date, horizon=horizon, aggregation=aggregation)
+    except ValidationError as e:
+        return JSONResponse(status_code=422, content={"detail": e.errors()})
+
+    try:
+        etag = _forecast_etag(_get_model_version(), request.start_date, request.horizon, request.aggregation)
+    except Exception as e:
+        _shed_if_warehouse_saturated(e, forecast_admission)
+        # Without a model version we cannot build a safe validator; answer uncached
+        response.headers["Cache-Control"] = "no-store"
+        return ForecastResponse(meta={}, data=[], error=str(e))
+
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={MODEL_VERSION_TTL_SECONDS}, must-revalidate",
+    }
+    if _etag_matches(http_request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    result = forecast(request)
+    if isinstance(result, Response):
+        result.headers["Cache-Control"] = "no-store"
+    elif result.error:
+        response.headers["Cache-Control"] = "no-store"
+    else:
+        response.headers.update(cache_headers)
+    return result
+
+
+@api.get("/forecast/window")
+def forecast_window():
+    """Dates and maximum horizon the served model can forecast; the UI bounds its inputs with it."""
+    if _is_mock_mode():
+        today = datetime.date.today()
+        return {
+            "start_date": today.isoformat(),
+            "end_date": (today + datetime.timedelta(days=FORECAST_MAX_HORIZON - 1)).isoformat(),
+            "max_horizon": FORECAST_MAX_HORIZON,
+            "data_frequency": "DAILY",
+            "source": "mock",
+        }
+    try:
+        return ForecastCore(MODEL_PATH, PROJECT_ID).forecast_window(_get_model_version())
+    except Exception as e:
+        _shed_if_warehouse_saturated(e, forecast_admission)
+        return JSONResponse(status_code=502, content={"status": "error", "error": str(e)})
+
+
+@api.get("/forecast/export")
+def forecast_export(
+    start_date: str,
+    horizon: int = Query(...),
+    fmt: str = Query("ndjson", alias="format", regex="^(ndjson|arrow|parquet)$"),
+    confidence_level: float = Query(0.95, gt=0, lt=1),
+):
+    """
+    Stream the full ML.FORECAST output (values, prediction intervals and any
+    series id columns) as NDJSON, Arrow IPC stream or Parquet.
+
+    Rows are paged from BigQuery as Arrow record batches and encoded batch by
+    batch, so memory stays bounded by the page size.
+    """
+    try:
+        request = ForecastRequest(start_date=start_date, horizon=horizon)
+    except ValidationError as e:
+        return JSONResponse(status_code=422, content={"detail": e.errors()})
+
+    if _is_mock_mode():
+        if request.horizon > FORECAST_MAX_HORIZON:
+            return JSONResponse(status_code=422, content={
+                "status": "error", "error": f"horizon must be at most {FORECAST_MAX_HORIZON}."})
+        start = datetime.datetime.fromisoformat(request.start_date)
+        batches = pa.Table.from_pylist([
+            {"forecast_timestamp": start + datetime.timedelta(days=i), "forecast_value": float(100 + i)}
+            for i in range(request.horizon)
+        ]).to_batches()
+    else:
+        # Only the ML.FORECAST job counts against admission; paging results does not
+        with forecast_admission.slot():
+            try:
+                fc = ForecastCore(MODEL_PATH, PROJECT_ID)
+                rows = fc.forecast_rows(request.start_date, request.horizon, confidence_level,
+                                        model_version=_get_model_version())
+            except ValueError as e:
+                # Outside the model's forecast window; rejected before ML.FORECAST runs
+                return JSONResponse(status_code=422, content={"status": "error", "error": str(e)})
+            except Exception as e:
+                _shed_if_warehouse_saturated(e, forecast_admission)
+                return JSONResponse(status_code=502, content={"status": "error", "error": str(e)})
+        batches = rows.to_arrow_iterable()
+
+    filename = f"forecast_{request.start_date.replace(':', '')}_{request.horizon}.{fmt}"
+    return StreamingResponse(
+        STREAMERS[fmt](batches),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ============================
+# Anomaly scoring (micro-batched)
+# ============================
+ANOMALY_PROB_THRESHOLD = float(os.getenv("ANOMALY_PROB_THRESHOLD", "0.95"))
+ANOMALY_REQUEST_TIMEOUT_SECONDS = float(os.getenv("ANOMALY_REQUEST_TIMEOUT_SECONDS", "30"))
+
+
+def _score_anomaly_batch(observations: list) -> list:
+    """One ML.DETECT_ANOMALIES job for every observation collected in the window."""
+    if _is_mock_mode():
+        return [
+            {"is_anomaly": value > 1000, "lower_bound": 0.0, "upper_bound": 1000.0,
+             "anomaly_probability": 1.0 if value > 1000 else 0.0}
+            for _, value in observations
+        ]
+    with forecast_admission.slot():
+        fc = ForecastCore(MODEL_PATH, PROJECT_ID)
+        return fc.detect_anomalies(observations, threshold=ANOMALY_PROB_THRESHOLD,
+                                   model_version=_get_model_version())
+
+
+anomaly_batcher = MicroBatcher(
+    _score_anomaly_batch,
+    max_batch_size=int(os.getenv("ANOMALY_MAX_BATCH_SIZE", "500")),
+    max_wait_seconds=float(os.getenv("ANOMALY_BATCH_WINDOW_SECONDS", "0.25")),
+    max_in_flight=int(os.getenv("ANOMALY_MAX_IN_FLIGHT_BATCHES", "2")),
+    name="anomalies",
+)
+
+
+class Observation(BaseModel):
+    timestamp: datetime.datetime
+    value: float
+
+    @validator("timestamp", pre=True)
+    def accept_plain_date(cls, v):
+        # Daily series send plain YYYY-MM-DD dates
+        if isinstance(v, str) and len(v) == 10:
+            return f"{v}T00:00:00"
+        return v
+
+
+class AnomalyRequest(BaseModel):
+    observations: List[Observation] = Field(..., min_items=1, max_items=1000)
+
+
+@api.post("/anomalies")
+def anomalies(request: AnomalyRequest):
+    """
+    Score new observations against the active ARIMA model.
+
+    Observations from concurrent requests are pooled for up to the batching
+    window and scored with a single ML.DETECT_ANOMALIES query per batch.
+    """
+    items = [
+        (o.timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None) if o.timestamp.tzinfo else o.timestamp, o.value)
+        for o in request.observations
+    ]
+    started = time.monotonic()
+    try:
+        scores = anomaly_batcher.submit(items, timeout=ANOMALY_REQUEST_TIMEOUT_SECONDS)
+    except concurrent.futures.TimeoutError:
+        # Not the builtin TimeoutError before Python 3.11 (the image runs 3.10)
+        return JSONResponse(status_code=504, content={"status": "error", "error": "Timed out waiting for anomaly scoring"})
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        _shed_if_warehouse_saturated(e, forecast_admission)
+        return JSONResponse(status_code=502, content={"status": "error", "error": str(e)})
+
+    return {
+        "meta": {
+            "model": MODEL_PATH,
+            "anomaly_prob_threshold": ANOMALY_PROB_THRESHOLD,
+            "latency_ms": round((time.monotonic() - started) * 1000, 3),
+        },
+        "data": [
+            {"timestamp": ts.isoformat(), "value": value, **score}
+            for (ts, value), score in zip(items, scores)
+        ],
+    }
+
+
+@api.get("/anomalies/stats")
+def anomaly_stats():
+    return anomaly_batcher.stats()
+
+
 class RetrainRequest(BaseModel):
     model_name: str = Field(...)
     source_table: str = Field(...)
     dataset_id: Optional[str] = Field(None)
+    # Steps of data_frequency: 30 days of HOURLY data is 720
     horizon: int = Field(30, ge=1)
     cutoff_date: Optional[str] = None
+    time_col: str = "trip_date"
+    data_frequency: str = Field("AUTO_FREQUENCY", regex="^(AUTO_FREQUENCY|DAILY|HOURLY)$")
 
 
 @api.post('/retrain')
 def retrain(request: RetrainRequest):
+    with retrain_admission.slot():
+        return _run_retrain(request)
+
+
+def _run_retrain(request: RetrainRequest) -> dict:
     try:
         dataset = request.dataset_id if request.dataset_id else DATASET_ID
         trainer = BQMLTrainer(PROJECT_ID, dataset)
-        cutoff_date = request.cutoff_date
-        if not cutoff_date:
-            cutoff_date = trainer.get_max_date(request.source_table)
-        model_path = trainer.train_arima(request.source_table, request.model_name, horizon=request.horizon)
+        # One MAX() query serves both the default cutoff and the training_end label
+        training_end = trainer.get_max_timestamp(request.source_table, request.time_col)
+        cutoff_date = request.cutoff_date or trainer.date_string(training_end)
+        model_path = trainer.train_arima(
+            request.source_table,
+            request.model_name,
+            time_col=request.time_col,
+            horizon=request.horizon,
+            data_frequency=request.data_frequency,
+            training_end=training_end,
+        )
+        if model_path == MODEL_PATH:
+            # The served model changed; force the next ETag to pick up the new version
+            with _model_version_lock:
+                _model_version_cache["version"] = None
         return {
             "status": "ok",
             "model_path": model_path,
             "cutoff_date_used": cutoff_date,
         }
     except Exception as e:
+        _shed_if_warehouse_saturated(e, retrain_admission)
         return {"status": "error", "message": str(e)}
 
 
@@ -0,0 +1,88 @@
+"""
+Concurrent load against /api/forecast and /api/retrain with the fake BigQuery client.
+
+Reports throughput, latency percentiles and the status-code mix. Requests shed
+by admission control (429/503) return almost immediately, so latency is also
+reported separately for admitted_* and shed_* requests.
+
+    python -m benchmarks.bench_api_load --concurrency 32 --requests 500
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+
+from benchmarks.fake_bigquery import patch_bigquery
+from benchmarks.harness import run_concurrent
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api-service")
+
+# Status codes the API answers with when it sheds load
+SHED_STATUSES = (429, 503)
+
+
+def load_app():
+    """Import the API the way uvicorn does (from inside api-service/)."""
+    if API_DIR not in sys.path:
+        sys.path.insert(0, API_DIR)
+    cwd = os.getcwd()
+    os.chdir(API_DIR)  # StaticFiles resolves "static" relative to the working directory
+    try:
+        import main
+    finally:
+        os.chdir(cwd)
+    return main
+
+
+def _status_mix(responses) -> dict:
+    return dict(collections.Counter(str(r.status_code) for r in responses))
+
+
+def _admission(response) -> str:
+    return "shed" if response.status_code in SHED_STATUSES else "admitted"
+
+
+def run(latency: float = 0.05, requests: int = 300, concurrency: int = 16) -> dict:
+    from fastapi.testclient import TestClient
+
+    results = {}
+    with patch_bigquery(latency=latency):
+        main = load_app()
+        client = TestClient(main.app)
+
+        forecast = lambda: client.post("/api/forecast", json={"start_date": "2022-11-01", "horizon": 30})  # noqa: E731
+        summary, responses = run_concurrent(forecast, requests, concurrency, classify=_admission)
+        results["api.forecast_post"] = {**summary, "status": _status_mix(responses)}
+
+        params = {"start_date": "2022-11-01", "horizon": 30}
+        etag = client.get("/api/forecast", params=params).headers.get("etag", "")
+        revalidate = lambda: client.get("/api/forecast", params=params, headers={"If-None-Match": etag})  # noqa: E731
+        summary, responses = run_concurrent(revalidate, requests, concurrency)
+        results["api.forecast_get_304"] = {**summary, "status": _status_mix(responses)}
+
+        retrain = lambda: client.post("/api/retrain", json={  # noqa: E731
+            "model_name": "bench_model", "source_table": "train_2022", "horizon": 30,
+        })
+        # Retrain admits one job at a time and queues none: under concurrency
+        # nearly every call is shed, so also time it one call at a time
+        summary, responses = run_concurrent(retrain, max(1, requests // 10), concurrency, classify=_admission)
+        results["api.retrain"] = {**summary, "status": _status_mix(responses)}
+        summary, responses = run_concurrent(retrain, max(1, requests // 30), 1, classify=_admission)
+        results["api.retrain_sequential"] = {**summary, "status": _status_mix(responses)}
+
+        results["api.admission"] = client.get("/api/admission").json()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the forecast API offline.")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake job latency in seconds")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    print(json.dumps(run(args.latency, args.requests, args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+DataLoader split and save on large synthetic frames, with the fake BigQuery client.
+
+    python -m benchmarks.bench_data_loader --rows 5000000
+"""
+import argparse
+import json
+
+from benchmarks.bench_data_loader_memory import make_frame
+from benchmarks.fake_bigquery import patch_bigquery
+from benchmarks.harness import timed
+
+
+def run(rows: int = 2_000_000, cutoff: str = "2017-06-30") -> dict:
+    from logic_components.data_loader import DataLoader
+
+    df = make_frame(rows)
+    loader = DataLoader("bench-project", "bench_dataset", "aggregated_daily")
+
+    with patch_bigquery():
+        split_s, (train_df, test_df) = timed(lambda: loader.train_test_split(df, cutoff))
+        save_s, _ = timed(lambda: loader.save_to_bigquery(train_df, "train_bench"))
+
+    return {
+        "data_loader.split": {
+            "rows": rows,
+            "split_ms": round(split_s * 1000, 3),
+            "rows_per_second": round(rows / split_s, 1) if split_s else 0.0,
+        },
+        "data_loader.save": {
+            "rows": len(train_df),
+            "save_ms": round(save_s * 1000, 3),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark DataLoader split/save offline.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--cutoff", default="2017-06-30")
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.cutoff), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Peak-memory benchmark for DataLoader.train_test_split.
+
+Each variant runs in a fresh process on the same synthetic, date-ordered frame.
+Only allocations made by the split itself are counted: tracemalloc (Python and
+NumPy buffers) and a proxy Arrow memory pool are both started after the frame
+is built, so the cost of building it does not hide a smaller split.
+
+    python -m benchmarks.bench_data_loader_memory --rows 5000000
+"""
+import argparse
+import json
+import multiprocessing as mp
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+VARIANTS = ("legacy", "views", "downcast", "pyarrow")
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2015-01-01", periods=rows, freq="min").normalize()
+    return pd.DataFrame({
+        "trip_date": dates.date,  # object dates, as BigQuery DATE columns arrive without db-dtypes
+        "total_trips": rng.integers(0, 200_000, rows),
+        "total_fare": rng.random(rows) * 1e6,
+        "avg_distance": rng.random(rows) * 20,
+        "avg_passengers": rng.random(rows) * 4,
+    })
+
+
+def legacy_split(df: pd.DataFrame, date_column: str, train_end_date: str):
+    # The implementation DataLoader.train_test_split replaced
+    df = df.copy()
+    df[date_column] = pd.to_datetime(df[date_column])
+    train_cutoff = pd.to_datetime(train_end_date)
+    train_df = df[df[date_column] <= train_cutoff].copy()
+    test_df = df[df[date_column] > train_cutoff].copy()
+    return train_df, test_df
+
+
+def _run(variant: str, rows: int, cutoff: str, out) -> None:
+    from logic_components.data_loader import DataLoader
+
+    df = make_frame(rows)
+    if variant == "downcast":
+        df = DataLoader.downcast_numeric(df)
+    elif variant == "pyarrow":
+        # What load_data(dtype_backend="pyarrow") returns: trip_date is date32
+        df = pa.Table.from_pandas(df, preserve_index=False).to_pandas(types_mapper=pd.ArrowDtype)
+    frame_mb = df.memory_usage(deep=True).sum() / 2**20
+
+    arrow_pool = pa.proxy_memory_pool(pa.default_memory_pool())
+    pa.set_memory_pool(arrow_pool)
+    tracemalloc.start()
+
+    loader = DataLoader("bench", "bench", "bench")
+    if variant == "legacy":
+        train_df, test_df = legacy_split(df, loader.date_column, cutoff)
+    else:
+        train_df, test_df = loader.train_test_split(df, cutoff)
+
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    out.put({
+        "variant": variant,
+        "rows": rows,
+        "frame_mb": round(frame_mb, 1),
+        "split_peak_mb": round((python_peak + arrow_pool.max_memory()) / 2**20, 1),
+        "train_rows": len(train_df),
+        "test_rows": len(test_df),
+    })
+
+
+def run_benchmark(rows: int, cutoff: str) -> list:
+    ctx = mp.get_context("spawn")
+    results = []
+    for variant in VARIANTS:
+        out = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(variant, rows, cutoff, out))
+        proc.start()
+        results.append(out.get())
+        proc.join()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--cutoff", default="2017-06-30")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, args.cutoff)
+    for r in results:
+        print(json.dumps(r))
+    legacy, views = results[0], results[1]
+    if views["split_peak_mb"] >= legacy["split_peak_mb"]:
+        raise SystemExit("train_test_split no longer reduces peak memory compared to the legacy split")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+ForecastCore.forecast against the fake BigQuery client.
+
+Warm cases hit the per-version forecast cache after the first call; cold cases
+use a new model version per call, so every call runs ML.FORECAST (and pays
+`--latency`).
+
+    python -m benchmarks.bench_forecast_core --latency 0.05
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+
+from benchmarks.fake_bigquery import patch_bigquery
+from benchmarks.harness import run_concurrent, run_sequential
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api-service")
+MODEL_PATH = "bench-project.bench_dataset.daily_arima_default_model_v1"
+
+
+def run(latency: float = 0.0, iterations: int = 200, concurrency: int = 8) -> dict:
+    if API_DIR not in sys.path:
+        sys.path.insert(0, API_DIR)
+    from forecast_core import ForecastCore
+
+    results = {}
+    with patch_bigquery(latency=latency):
+        versions = itertools.count()
+
+        def warm():
+            return ForecastCore(MODEL_PATH, "bench-project").forecast("2022-11-01", 30, model_version="warm")
+
+        def cold():
+            version = f"cold-{next(versions)}"
+            return ForecastCore(MODEL_PATH, "bench-project").forecast("2022-11-01", 30, model_version=version)
+
+        for name, call in (("warm", warm), ("cold", cold)):
+            results[f"forecast_core.{name}.sequential"] = run_sequential(call, iterations)
+            summary, _ = run_concurrent(call, iterations, concurrency)
+            results[f"forecast_core.{name}.concurrent"] = summary
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ForecastCore.forecast offline.")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake job latency in seconds")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(run(args.latency, args.iterations, args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
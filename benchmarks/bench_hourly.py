@@ -0,0 +1,135 @@
+"""
+Daily vs hourly (24x the rows) through load, train and serve, checked against latency budgets.
+
+- load:  DataLoader.load_data (the fake client counts raw trip events per
+         period) + train_test_split over the fake BigQuery client
+- train: the local DuckDB pipeline (load, train, evaluate components), when duckdb and kfp are installed
+- serve: ForecastCore.forecast / rollup from the cached full-horizon forecast;
+         gated on p90, since p99 over a few hundred samples is one outlier
+
+    python -m benchmarks.bench_hourly --days 1095
+    python -m benchmarks.bench_hourly --serve-budget-ms 10   # exit 1 if over budget
+"""
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.fake_bigquery import patch_bigquery
+from benchmarks.harness import run_sequential, timed
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api-service")
+
+# Per-call budgets for the hourly path; daily runs are reported for the ratio
+BUDGETS = {"load_ms": 1000.0, "train_ms": 5000.0, "serve_p90_ms": 25.0}
+
+# rows per day and forecast horizon (30 days) at each granularity
+FREQUENCIES = {"DAILY": (1, 30), "HOURLY": (24, 720)}
+
+
+def bench_load(days: int) -> dict:
+    from logic_components.data_loader import DataLoader
+
+    results = {}
+    for frequency, (per_day, _) in FREQUENCIES.items():
+        rows = days * per_day
+        loader = DataLoader("bench-project", "bench_dataset", "trips", data_frequency=frequency)
+        with patch_bigquery(data_frequency=frequency, table_rows=rows):
+            # Warm-up builds the (cached) raw events table, which is not part of the load
+            loader.load_data(aggregate_from="pickup_datetime")
+            load_s, df = timed(lambda: loader.load_data(aggregate_from="pickup_datetime"))
+        split_s, _ = timed(lambda: loader.train_test_split(df, "2017-06-30"))
+        results[frequency] = {"rows": rows, "load_ms": round(load_s * 1000, 3), "split_ms": round(split_s * 1000, 3)}
+    return results
+
+
+def bench_train(days: int) -> dict:
+    try:
+        import duckdb  # noqa: F401
+        import kfp  # noqa: F401  (the local runner calls the pipeline components)
+    except ImportError:
+        return {}
+    from pipelines.local_runner_v2 import run_local_pipeline, synthetic_daily_trips, synthetic_hourly_trips
+
+    results = {}
+    for frequency, (per_day, horizon) in FREQUENCIES.items():
+        if frequency == "HOURLY":
+            source_df, time_column = synthetic_hourly_trips(days), "trip_hour"
+        else:
+            source_df, time_column = synthetic_daily_trips(days), "trip_date"
+        report = run_local_pipeline(
+            source_df,
+            cutoff_date="2022-11-01",
+            forecasters=["seasonal_naive"],
+            time_column=time_column,
+            data_frequency=frequency,
+            horizon=horizon,
+        )
+        results[frequency] = {
+            "rows": len(source_df),
+            "train_ms": round(report["phases_seconds"]["train[seasonal_naive]"] * 1000, 3),
+            "pipeline_ms": round(report["wall_seconds"] * 1000, 3),
+        }
+    return results
+
+
+def bench_serve(iterations: int) -> dict:
+    if API_DIR not in sys.path:
+        sys.path.insert(0, API_DIR)
+    from forecast_core import ForecastCore
+
+    results = {}
+    for frequency, (_, horizon) in FREQUENCIES.items():
+        model_path = f"bench-project.bench_dataset.{frequency.lower()}_model"
+        with patch_bigquery(data_frequency=frequency, model_horizon=horizon):
+            core = ForecastCore(model_path, "bench-project")
+            forecast = run_sequential(lambda: core.forecast("2022-11-01", horizon, model_version="v1"), iterations)
+            rollup = run_sequential(lambda: core.rollup("2022-11-01", horizon, "week", model_version="v1"), iterations)
+        results[frequency] = {
+            "points": horizon,
+            "serve_p50_ms": forecast["p50_ms"],
+            "serve_p90_ms": forecast["p90_ms"],
+            "serve_p99_ms": forecast["p99_ms"],
+            "rollup_p99_ms": rollup["p99_ms"],
+        }
+    return results
+
+
+def run(days: int = 1095, iterations: int = 200, budgets: dict = None) -> dict:
+    budgets = {**BUDGETS, **(budgets or {})}
+    results = {}
+    for path, measured in (("load", bench_load(days)), ("train", bench_train(days)), ("serve", bench_serve(iterations))):
+        if not measured:
+            continue
+        daily, hourly = measured["DAILY"], measured["HOURLY"]
+        budget_key = next(k for k in budgets if k in hourly)
+        results[f"hourly.{path}"] = {
+            **hourly,
+            "daily_" + budget_key: daily[budget_key],
+            "budget_" + budget_key: budgets[budget_key],
+            "within_budget": hourly[budget_key] <= budgets[budget_key],
+        }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the hourly load/train/serve path against daily.")
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--load-budget-ms", type=float, default=BUDGETS["load_ms"])
+    parser.add_argument("--train-budget-ms", type=float, default=BUDGETS["train_ms"])
+    parser.add_argument("--serve-budget-ms", type=float, default=BUDGETS["serve_p90_ms"],
+                        help="budget for the p90 hourly forecast latency")
+    args = parser.parse_args()
+
+    results = run(args.days, args.iterations, {
+        "load_ms": args.load_budget_ms,
+        "train_ms": args.train_budget_ms,
+        "serve_p90_ms": args.serve_budget_ms,
+    })
+    print(json.dumps(results, indent=2))
+    return 0 if all(r["within_budget"] for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
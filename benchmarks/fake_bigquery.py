@@ -0,0 +1,244 @@
+"""
+In-process stand-in for `google.cloud.bigquery.Client` used by the benchmarks.
+
+It answers the handful of query shapes this repo issues (ML.FORECAST, MAX(date),
+ML.ARIMA_EVALUATE, CREATE MODEL, SELECT * table reads) with canned frames after
+a configurable latency, and can inject transient faults. TIMESTAMP_TRUNC
+aggregations really count a synthetic table of raw trip events. `patch_bigquery()` swaps it in for
+every module that does `from google.cloud import bigquery`.
+"""
+import concurrent.futures
+import datetime
+import functools
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from google.api_core import exceptions as api_exceptions
+from google.cloud import bigquery
+
+
+def forecast_frame(horizon: int, start: str = "2022-11-01", freq: str = "D") -> pd.DataFrame:
+    timestamps = pd.date_range(start, periods=horizon, freq=freq, tz="UTC")
+    values = 90_000 + 10_000 * np.sin(np.arange(horizon) * 2 * np.pi / 7)
+    return pd.DataFrame({
+        "forecast_timestamp": timestamps,
+        "forecast_value": values,
+        "standard_error": np.full(horizon, 4_000.0),
+        "confidence_level": np.full(horizon, 0.95),
+        "prediction_interval_lower_bound": values - 7_840.0,
+        "prediction_interval_upper_bound": values + 7_840.0,
+    })
+
+
+def table_frame(rows: int, date_column: str = "trip_date", freq: str = "D") -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        date_column: pd.date_range("2015-01-01", periods=rows, freq=freq),
+        "total_trips": rng.integers(50_000, 150_000, rows),
+    })
+
+
+# Raw trips per aggregated period in the synthetic events table
+TRIPS_PER_PERIOD = 20
+
+TRUNC_PARTS = {"DAY": "D", "HOUR": "h"}
+
+
+@functools.lru_cache(maxsize=4)
+def trip_events(periods: int, freq: str = "D", seed: int = 0) -> pd.Series:
+    """Event timestamps (UTC) of a raw trips table spanning `periods` periods of `freq`."""
+    start = pd.Timestamp("2015-01-01", tz="UTC")
+    span_ns = (pd.date_range(start, periods=periods + 1, freq=freq)[-1] - start).value
+    offsets = np.random.default_rng(seed).integers(0, span_ns, periods * TRIPS_PER_PERIOD)
+    return pd.Series(start + pd.to_timedelta(offsets, unit="ns"))
+
+
+def aggregate_trips(query: str, periods: int, freq: str = "D") -> pd.DataFrame:
+    """Evaluate `SELECT TIMESTAMP_TRUNC(ts, PART) AS d, COUNT(*) AS n ... GROUP BY 1 ORDER BY 1`."""
+    match = re.search(r"TIMESTAMP_TRUNC\(\w+, (\w+)\) AS (\w+),\s*COUNT\(\*\) AS (\w+)", query)
+    part, date_column, value_column = match.groups()
+    counts = trip_events(periods, freq).dt.floor(TRUNC_PARTS[part]).value_counts().sort_index()
+    return pd.DataFrame({date_column: counts.index, value_column: counts.to_numpy()})
+
+
+class FakeRowIterator:
+    def __init__(self, df: pd.DataFrame) -> None:
+        self._df = df
+        self.total_rows = len(df)
+
+    def to_dataframe(self, *args, **kwargs) -> pd.DataFrame:
+        return self._df.copy()
+
+    def to_arrow(self, *args, **kwargs) -> pa.Table:
+        return pa.Table.from_pandas(self._df, preserve_index=False)
+
+    def to_arrow_iterable(self, *args, **kwargs):
+        yield from self.to_arrow().to_batches(max_chunksize=10_000)
+
+    def __iter__(self):
+        for record in self._df.to_dict("records"):
+            yield record
+
+
+class FakeJob:
+    """Finishes `latency` seconds after creation, like a job polled by result()."""
+
+    job_type = "query"
+
+    def __init__(self, df: pd.DataFrame, latency: float, error: Optional[Exception] = None) -> None:
+        self.job_id = uuid.uuid4().hex
+        self._df = df
+        self._error = error
+        self._latency = latency
+        self._done_at = time.monotonic() + latency
+        self.created = datetime.datetime.now(datetime.timezone.utc)
+        self.started = self.created
+        self.ended = None
+        self.cancelled = False
+        self.total_bytes_processed = len(df) * 64
+        self.total_bytes_billed = self.total_bytes_processed
+        self.slot_millis = int(latency * 1000)
+
+    def result(self, timeout: Optional[float] = None, **kwargs) -> FakeRowIterator:
+        remaining = self._done_at - time.monotonic()
+        if timeout is not None and remaining > timeout:
+            time.sleep(timeout)
+            # What google-cloud-bigquery raises; only an alias of TimeoutError from Python 3.11
+            raise concurrent.futures.TimeoutError("fake job still running")
+        time.sleep(max(0.0, remaining))
+        self.ended = self.started + datetime.timedelta(seconds=self._latency)
+        if self._error is not None:
+            raise self._error
+        return FakeRowIterator(self._df)
+
+    def to_dataframe(self, *args, **kwargs) -> pd.DataFrame:
+        return self.result().to_dataframe()
+
+    def cancel(self) -> bool:
+        self.cancelled = True
+        return True
+
+
+# data_frequency -> (pandas frequency, training_end label of the canned model)
+FREQUENCIES = {"DAILY": ("D", "2022-10-31"), "HOURLY": ("h", "2022-10-31t23-00-00")}
+
+
+class FakeModel:
+    def __init__(self, etag: str, data_frequency: str = "DAILY", horizon: int = 30) -> None:
+        self.etag = etag
+        self.modified = datetime.datetime(2022, 11, 1, tzinfo=datetime.timezone.utc)
+        self.training_runs = [{"trainingOptions": {
+            "horizon": str(horizon),
+            "dataFrequency": data_frequency,
+            "timeSeriesTimestampColumn": "trip_date",
+            "timeSeriesDataColumn": "total_trips",
+        }}]
+        self.labels = {"training_end": FREQUENCIES[data_frequency][1]}
+
+
+class FakeClient:
+    """
+    `latency` is seconds per job, or a callable returning it (e.g. to model a
+    long tail). `fault_rate` is the probability a job fails with 503.
+    `data_frequency` ("DAILY" / "HOURLY") sets the spacing of table and
+    forecast rows and the served model's metadata; `model_horizon` is its
+    horizon in steps. `models` lists the "project.dataset.model" paths the
+    catalog knows about (list_models / ML.ARIMA_EVALUATE).
+    """
+
+    def __init__(
+        self,
+        project: Optional[str] = None,
+        latency=0.0,
+        fault_rate: float = 0.0,
+        table_rows: int = 365,
+        seed: int = 0,
+        data_frequency: str = "DAILY",
+        model_horizon: int = 30,
+        models=(),
+        **kwargs,
+    ) -> None:
+        self.project = project
+        self.data_frequency = data_frequency
+        self.model_horizon = model_horizon
+        self._freq = FREQUENCIES[data_frequency][0]
+        self._latency = latency
+        self.fault_rate = fault_rate
+        self.table_rows = table_rows
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.queries = []
+        self.loaded = {}
+        self.models = list(models)
+
+    def _next_latency(self) -> float:
+        return self._latency() if callable(self._latency) else float(self._latency)
+
+    def _next_error(self) -> Optional[Exception]:
+        with self._lock:
+            if self._rng.random() < self.fault_rate:
+                return api_exceptions.ServiceUnavailable("injected fault")
+        return None
+
+    def query(self, query: str, job_config=None, **kwargs) -> FakeJob:
+        with self._lock:
+            self.queries.append(query)
+        if "ML.FORECAST" in query:
+            match = re.search(r"STRUCT\((\d+) AS horizon", query)
+            df = forecast_frame(int(match.group(1)) if match else self.model_horizon, freq=self._freq)
+        elif "ML.ARIMA_EVALUATE" in query:
+            paths = re.findall(r"ML\.ARIMA_EVALUATE\(MODEL `([^`]+)`\)", query)
+            missing = [p for p in paths if p not in self.models]
+            if missing:
+                return FakeJob(pd.DataFrame(), self._next_latency(), api_exceptions.NotFound(f"Not found: Model {missing[0]}"))
+            df = pd.DataFrame({"model": paths, "aic": [1000.0 + self.models.index(p) for p in paths]})
+        elif "MAX(" in query:
+            df = pd.DataFrame({"max_date": [datetime.date(2022, 10, 31)]})
+        elif "TIMESTAMP_TRUNC(" in query:
+            df = aggregate_trips(query, self.table_rows, self._freq)
+        elif "SELECT *" in query:
+            df = table_frame(self.table_rows, freq=self._freq)
+        else:
+            df = pd.DataFrame()
+        return FakeJob(df, self._next_latency(), self._next_error())
+
+    def load_table_from_dataframe(self, df: pd.DataFrame, table_id: str, job_config=None, **kwargs) -> FakeJob:
+        # Serialize like the real client does before upload, so the cost is realistic
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with self._lock:
+            self.loaded[table_id] = table.num_rows
+        job = FakeJob(pd.DataFrame(), self._next_latency(), self._next_error())
+        job.job_type = "load"
+        return job
+
+    def get_model(self, model_ref, **kwargs) -> FakeModel:
+        return FakeModel(etag="fake-etag-1", data_frequency=self.data_frequency, horizon=self.model_horizon)
+
+    def list_models(self, dataset, **kwargs):
+        dataset = str(dataset)
+        if not any(p.startswith(dataset + ".") for p in self.models):
+            raise api_exceptions.NotFound(f"Not found: Dataset {dataset}")
+        return [SimpleNamespace(model_id=p.rsplit(".", 1)[1]) for p in self.models if p.rsplit(".", 1)[0] == dataset]
+
+    def update_model(self, model: FakeModel, fields, **kwargs) -> FakeModel:
+        return model
+
+
+@contextmanager
+def patch_bigquery(factory: Optional[Callable[..., FakeClient]] = None, **client_kwargs):
+    """Make `bigquery.Client(...)` return FakeClient instances inside the block."""
+    original = bigquery.Client
+    bigquery.Client = factory or (lambda *args, **kwargs: FakeClient(*args, **{**client_kwargs, **kwargs}))
+    try:
+        yield
+    finally:
+        bigquery.Client = original
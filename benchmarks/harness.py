@@ -0,0 +1,103 @@
+"""Timing, concurrency and result-storage helpers shared by the benchmarks."""
+import collections
+import concurrent.futures
+import json
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Metrics where a larger value is better; everything else is a latency/size
+HIGHER_IS_BETTER = ("throughput_rps", "rows_per_second")
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def summarize(latencies: List[float], wall_seconds: float) -> Dict[str, float]:
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def timed(fn: Callable[[], Any]) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def run_sequential(fn: Callable[[], Any], iterations: int, warmup: int = 2) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        latencies.append(timed(fn)[0])
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def run_concurrent(
+    fn: Callable[[], Any],
+    requests: int,
+    concurrency: int,
+    classify: Optional[Callable[[Any], str]] = None,
+) -> Tuple[Dict[str, float], List[Any]]:
+    """
+    Fire `requests` calls of `fn` from `concurrency` threads; return the summary and results.
+
+    With `classify`, each result is also put in a group (e.g. "admitted" /
+    "shed") and every group gets its own `<group>_<metric>` latency summary, so
+    fast rejections do not hide the latency of the calls that did the work.
+    """
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda _: timed(fn), range(requests)))
+    wall = time.perf_counter() - started
+    summary = summarize([o[0] for o in outcomes], wall)
+    if classify is not None:
+        groups = collections.defaultdict(list)
+        for latency, result in outcomes:
+            groups[classify(result)].append(latency)
+        for group, latencies in sorted(groups.items()):
+            summary.update({f"{group}_{k}": v for k, v in summarize(latencies, wall).items()})
+    return summary, [o[1] for o in outcomes]
+
+
+def save_results(results: Dict[str, Any], name: str = "latest") -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_results(name: str = "baseline") -> Dict[str, Any]:
+    path = name if name.endswith(".json") else os.path.join(RESULTS_DIR, f"{name}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a line per metric that got worse by more than `threshold` (relative)."""
+    regressions = []
+    for bench, metrics in current.items():
+        for metric, value in metrics.items():
+            base = baseline.get(bench, {}).get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+                continue
+            change = (value - base) / base
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if metric.endswith(("_ms", "_rps", "_mb", "_per_second")) and change > threshold:
+                regressions.append(f"{bench}.{metric}: {base} -> {value} ({change:+.1%} worse)")
+    return regressions
@@ -0,0 +1,49 @@
+"""
+Run every offline benchmark, store the results and compare them to a baseline.
+
+    python -m benchmarks.run_all                      # writes benchmarks/results/latest.json
+    python -m benchmarks.run_all --save-baseline      # also records it as baseline.json
+    python -m benchmarks.run_all --threshold 0.25     # exit 1 on >25% regressions vs baseline
+"""
+import argparse
+import json
+import os
+import sys
+
+from benchmarks import bench_api_load, bench_data_loader, bench_forecast_core, bench_hourly
+from benchmarks.harness import RESULTS_DIR, compare_results, load_results, save_results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake BigQuery job latency in seconds")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="synthetic DataLoader frame size")
+    parser.add_argument("--baseline", default="baseline", help="baseline name or path to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    results.update(bench_forecast_core.run(latency=args.latency))
+    results.update(bench_api_load.run(latency=args.latency))
+    results.update(bench_data_loader.run(rows=args.rows))
+    results.update(bench_hourly.run())
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {save_results(results)}")
+    if args.save_baseline:
+        print(f"Baseline written to {save_results(results, 'baseline')}")
+        return 0
+
+    baseline_path = args.baseline if args.baseline.endswith(".json") else os.path.join(RESULTS_DIR, f"{args.baseline}.json")
+    if not os.path.exists(baseline_path):
+        print("No baseline found; run with --save-baseline to record one.")
+        return 0
+    regressions = compare_results(load_results(baseline_path), results, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,12 @@
-from typing import Tuple
+from typing import Any, Optional, Tuple
 import pandas as pd
 from google.cloud import bigquery
+from logic_components.query_executor import QueryExecutor
+
+
+# BQML `data_frequency` values supported end to end, with the TIMESTAMP_TRUNC
+# part that aggregates raw rows to that granularity
+DATA_FREQUENCIES = {"DAILY": "DAY", "HOURLY": "HOUR"}
 
 
 class DataLoader:
@@ -10,29 +16,93 @@ class DataLoader:
         dataset_id: str,
         table_id: str,
         date_column: str = "trip_date",
+        timeout: float = 600.0,
+        client: Optional[Any] = None,
+        data_frequency: str = "DAILY",
+        value_column: str = "total_trips",
     ) -> None:
+        if data_frequency not in DATA_FREQUENCIES:
+            raise ValueError(f"data_frequency must be one of {sorted(DATA_FREQUENCIES)}.")
 
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.table_id = table_id
         self.date_column = date_column
+        self.data_frequency = data_frequency
+        self.value_column = value_column
+        self.timeout = timeout
+        # Injected warehouse client (e.g. the local DuckDB stand-in); BigQuery otherwise
+        self.client = client
+        # Finished warehouse jobs, for profiling
+        self.jobs = []
+
+    def _client(self):
+        if self.client is not None:
+            return self.client
+        return bigquery.Client(project=self.project_id)
 
     # ----------------------------
     # Load data from BigQuery
     # ----------------------------
-    def load_data(self) -> pd.DataFrame:
+    def load_data(
+        self,
+        dtype_backend: str = "numpy",
+        downcast: bool = False,
+        aggregate_from: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Load the source table ordered by the date column.
+
+        dtype_backend="pyarrow" keeps the columns Arrow-backed (no conversion to
+        NumPy/object columns); downcast=True shrinks numeric NumPy columns to the
+        smallest dtype that holds them.
+
+        aggregate_from names an event timestamp column of a raw (one row per
+        trip) table; rows are then counted per `data_frequency` period in the
+        warehouse and only the aggregated series
+        (`date_column`, `value_column`) is downloaded.
+        """
+        if dtype_backend not in ("numpy", "pyarrow"):
+            raise ValueError("dtype_backend must be 'numpy' or 'pyarrow'.")
 
-        client = bigquery.Client(project=self.project_id)
+        client = self._client()
+        executor = QueryExecutor(client, timeout=self.timeout)
 
         table_ref = f"{self.project_id}.{self.dataset_id}.{self.table_id}"
 
-        query = f"""
-            SELECT *
-            FROM `{table_ref}`
-            ORDER BY {self.date_column}
-        """
+        if aggregate_from:
+            query = f"""
+                SELECT
+                    TIMESTAMP_TRUNC({aggregate_from}, {DATA_FREQUENCIES[self.data_frequency]}) AS {self.date_column},
+                    COUNT(*) AS {self.value_column}
+                FROM `{table_ref}`
+                GROUP BY 1
+                ORDER BY 1
+            """
+        else:
+            query = f"""
+                SELECT *
+                FROM `{table_ref}`
+                ORDER BY {self.date_column}
+            """
+
+        rows = executor.run(query)
+        self.jobs.extend(executor.jobs)
+        if dtype_backend == "pyarrow":
+            df = rows.to_arrow().to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            df = rows.to_dataframe()
+
+        if downcast:
+            df = self.downcast_numeric(df)
+        return df
 
-        df = client.query(query).to_dataframe()
+    @staticmethod
+    def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+        for col in df.select_dtypes(include="integer").columns:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+        for col in df.select_dtypes(include="floating").columns:
+            df[col] = pd.to_numeric(df[col], downcast="float")
         return df
 
     # ----------------------------
@@ -43,16 +113,44 @@ class DataLoader:
         df: pd.DataFrame,
         train_end_date: str,
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Split rows on or before `train_end_date` from the rest.
+
+        `load_data` returns rows ordered by date, so the cutoff is found with a
+        binary search and both parts are positional slices (views) of `df`
+        rather than copies; copy them before mutating. Unsorted input falls back
+        to a boolean mask. The date column keeps the dtype it was loaded with.
 
-        df = df.copy()
-        df[self.date_column] = pd.to_datetime(df[self.date_column])
+        For sub-daily data a bare date (YYYY-MM-DD) keeps every period of that
+        day in train; a full timestamp is used as-is.
+        """
+        dates = df[self.date_column]
+        if isinstance(dates.dtype, pd.ArrowDtype):
+            # dtype_backend="pyarrow": DATE loads as date32 and TIMESTAMP as
+            # timestamp[tz=UTC]; both report kind "M" but compare against
+            # datetime.date / lack .dt.tz, so go through NumPy datetime64
+            import pyarrow as pa
+
+            dates = pa.array(dates.array).to_pandas(date_as_object=False)
+        elif dates.dtype.kind != "M":
+            # Only the date column is converted, and only for the comparison
+            dates = pd.to_datetime(dates)
 
         train_cutoff = pd.to_datetime(train_end_date)
+        side = "right"
+        if self.data_frequency != "DAILY" and len(str(train_end_date)) == 10:
+            train_cutoff += pd.Timedelta(days=1)
+            side = "left"
+        if getattr(dates.dt, "tz", None) is not None and train_cutoff.tzinfo is None:
+            # TIMESTAMP columns come back in UTC
+            train_cutoff = train_cutoff.tz_localize("UTC")
 
-        train_df = df[df[self.date_column] <= train_cutoff].copy()
-        test_df = df[df[self.date_column] > train_cutoff].copy()
+        if dates.is_monotonic_increasing:
+            split_at = int(dates.searchsorted(train_cutoff, side=side))
+            return df.iloc[:split_at], df.iloc[split_at:]
 
-        return train_df, test_df
+        in_train = (dates <= train_cutoff if side == "right" else dates < train_cutoff).to_numpy()
+        return df[in_train], df[~in_train]
 
     # ----------------------------
     # Save DataFrame to BigQuery
@@ -64,7 +162,8 @@ class DataLoader:
         write_disposition: str = "WRITE_TRUNCATE",
     ) -> None:
 
-        client = bigquery.Client(project=self.project_id)
+        client = self._client()
+        executor = QueryExecutor(client, timeout=self.timeout)
 
         table_id = f"{self.project_id}.{self.dataset_id}.{target_table}"
 
@@ -72,11 +171,15 @@ class DataLoader:
             write_disposition=write_disposition,
         )
 
-        load_job = client.load_table_from_dataframe(
-            df,
-            table_id,
-            job_config=job_config,
+        # WRITE_TRUNCATE / WRITE_EMPTY loads are safe to resubmit on transient errors
+        executor.execute(
+            lambda: client.load_table_from_dataframe(
+                df,
+                table_id,
+                job_config=job_config,
+            ),
+            retry=write_disposition != "WRITE_APPEND",
         )
-        load_job.result()
+        self.jobs.extend(executor.jobs)
 
         print(f"[DataLoader] Saved {len(df)} rows to {table_id}")
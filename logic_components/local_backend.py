@@ -0,0 +1,339 @@
+"""
+Local, in-process stand-ins for the BigQuery pieces of the pipeline.
+
+- `DuckDBClient` answers the `bigquery.Client` calls the pipeline components
+  make (queries, dataframe loads, the model catalog) against a DuckDB database
+  instead of BigQuery. BQML statements are emulated: CREATE MODEL fits a local
+  forecaster, ML.ARIMA_EVALUATE reads its AIC.
+- Forecasters implement `fit(timestamps, values)` / `forecast(horizon)` / `aic`
+  and replace BQML ARIMA_PLUS.
+
+Used by `pipelines.local_runner_v2`; no network access is needed.
+"""
+import datetime
+import importlib
+import math
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from google.api_core import exceptions as api_exceptions
+from google.cloud import bigquery
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - optional dependency
+    duckdb = None
+
+
+# `project.dataset.table` in backticks -> one quoted DuckDB identifier
+_BACKTICK_IDENT = re.compile(r"`([^`]+)`")
+# TIMESTAMP_TRUNC(col, HOUR) -> date_trunc('hour', col)
+_TIMESTAMP_TRUNC = re.compile(r"TIMESTAMP_TRUNC\(\s*([^,()]+?)\s*,\s*(\w+)\s*\)", re.IGNORECASE)
+
+
+# CREATE [OR REPLACE] MODEL `path` OPTIONS(...) AS <select>
+_CREATE_MODEL = re.compile(
+    r"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?MODEL\s+`([^`]+)`\s+OPTIONS\s*\((.*?)\)\s*AS\s+(.*?);?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_MODEL_OPTION = re.compile(r"(\w+)\s*=\s*(?:'([^']*)'|([^,\s]+))")
+_ARIMA_EVALUATE = re.compile(r"ML\.ARIMA_EVALUATE\(\s*MODEL\s+`([^`]+)`\s*\)", re.IGNORECASE)
+_MODELS_VIEW = re.compile(r"`([^`.]+\.[^`.]+)\.INFORMATION_SCHEMA\.MODELS`", re.IGNORECASE)
+
+
+def to_duckdb_sql(query: str) -> str:
+    query = _TIMESTAMP_TRUNC.sub(lambda m: f"date_trunc('{m.group(2).lower()}', {m.group(1)})", query)
+    return _BACKTICK_IDENT.sub(lambda m: '"' + m.group(1) + '"', query)
+
+
+# ============================
+# Warehouse stand-in
+# ============================
+class LocalRowIterator:
+    def __init__(self, relation_df: pd.DataFrame) -> None:
+        self._df = relation_df
+        self.total_rows = len(relation_df)
+
+    def to_dataframe(self, *args, **kwargs) -> pd.DataFrame:
+        return self._df
+
+    def to_arrow(self, *args, **kwargs):
+        import pyarrow as pa
+        return pa.Table.from_pandas(self._df, preserve_index=False)
+
+    def __iter__(self):
+        return iter(self._df.to_dict("records"))
+
+
+class LocalJob:
+    """Already-finished job; exposes the attributes QueryExecutor and StepProfiler read."""
+
+    def __init__(self, job_type: str, df: Optional[pd.DataFrame], started: datetime.datetime) -> None:
+        self.job_id = f"local_{uuid.uuid4().hex[:12]}"
+        self.job_type = job_type
+        self.started = started
+        self.ended = datetime.datetime.now(datetime.timezone.utc)
+        self._df = df if df is not None else pd.DataFrame()
+        self.total_bytes_processed = int(self._df.memory_usage(deep=False).sum())
+
+    def result(self, timeout: Optional[float] = None, **kwargs) -> LocalRowIterator:
+        return LocalRowIterator(self._df)
+
+    def to_dataframe(self, *args, **kwargs) -> pd.DataFrame:
+        return self._df
+
+    def cancel(self) -> bool:
+        return False
+
+
+class DuckDBClient:
+    """
+    Minimal `bigquery.Client` look-alike over DuckDB. Tables keep their full
+    `project.dataset.table` name as a single identifier, so the SQL the
+    components build runs unchanged apart from identifier quoting.
+
+    Models live in `models` (path -> fitted forecaster). CREATE MODEL fits
+    `model_forecasters[path]`, or `default_forecaster` for unlisted paths.
+    """
+
+    def __init__(self, database: str = ":memory:", project: Optional[str] = None,
+                 default_forecaster: str = "seasonal_naive") -> None:
+        if duckdb is None:
+            raise ImportError("The local runner needs duckdb: pip install duckdb")
+        self.project = project
+        self._conn = duckdb.connect(database)
+        # DDL from parallel steps must not interleave
+        self._ddl_lock = threading.Lock()
+        self.default_forecaster = default_forecaster
+        self.model_forecasters: Dict[str, str] = {}
+        self.models: Dict[str, object] = {}
+        self._model_labels: Dict[str, Dict[str, str]] = {}
+
+    def _cursor(self):
+        # A cursor per call: DuckDB connections are not safe to share across threads
+        return self._conn.cursor()
+
+    def query(self, query: str, job_config=None, **kwargs) -> LocalJob:
+        started = datetime.datetime.now(datetime.timezone.utc)
+        create_model = _CREATE_MODEL.match(query)
+        if create_model:
+            self._create_model(*create_model.groups())
+            return LocalJob("query", None, started)
+        # Model reads become inline subqueries DuckDB can run
+        query = _ARIMA_EVALUATE.sub(lambda m: self._arima_evaluate_view(m.group(1)), query)
+        query = _MODELS_VIEW.sub(lambda m: self._models_view(m.group(1)), query)
+        cur = self._cursor()
+        try:
+            rel = cur.execute(to_duckdb_sql(query))
+            df = rel.df() if rel.description else None
+        finally:
+            cur.close()
+        return LocalJob("query", df, started)
+
+    def load_table_from_dataframe(self, df: pd.DataFrame, table_id: str, job_config=None, **kwargs) -> LocalJob:
+        started = datetime.datetime.now(datetime.timezone.utc)
+        disposition = getattr(job_config, "write_disposition", None) or "WRITE_APPEND"
+        cur = self._cursor()
+        try:
+            with self._ddl_lock:
+                cur.register("_incoming", df)
+                exists = bool(cur.execute(
+                    "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [table_id]
+                ).fetchone()[0])
+                if disposition == "WRITE_EMPTY" and exists:
+                    raise RuntimeError(f"Table {table_id} already exists and is not empty")
+                if disposition == "WRITE_TRUNCATE" or not exists:
+                    cur.execute(f'CREATE OR REPLACE TABLE "{table_id}" AS SELECT * FROM _incoming')
+                else:
+                    cur.execute(f'INSERT INTO "{table_id}" SELECT * FROM _incoming')
+                cur.unregister("_incoming")
+        finally:
+            cur.close()
+        job = LocalJob("load", None, started)
+        job.total_bytes_processed = int(df.memory_usage(deep=False).sum())
+        return job
+
+    def table(self, table_id: str) -> pd.DataFrame:
+        return self.query(f"SELECT * FROM `{table_id}`").to_dataframe()
+
+    # BQML emulation and the model catalog
+    def _create_model(self, path: str, options: str, select: str) -> None:
+        opts = {m.group(1).lower(): m.group(2) if m.group(2) is not None else m.group(3)
+                for m in _MODEL_OPTION.finditer(options)}
+        df = self.query(select).to_dataframe()
+        forecaster = self.model_forecasters.get(path, self.default_forecaster)
+        model = make_forecaster(forecaster).fit(df[opts["time_series_timestamp_col"]],
+                                                 df[opts["time_series_data_col"]])
+        # Forecasters infer their step from the timestamps; data_frequency is kept as metadata
+        model.horizon = int(opts.get("horizon", 1000))
+        model.data_frequency = opts.get("data_frequency", "AUTO_FREQUENCY")
+        with self._ddl_lock:
+            self.models[path] = model
+            self._model_labels[path] = {}
+        print(f"[DuckDBClient] {forecaster} model fitted for {path}")
+
+    def _model(self, path: str):
+        if path not in self.models:
+            raise api_exceptions.NotFound(f"Not found: Model {path}")
+        return self.models[path]
+
+    def _arima_evaluate_view(self, path: str) -> str:
+        # CAST from text so a nan AIC stays valid SQL
+        return f"(SELECT CAST('{self._model(path).aic!r}' AS DOUBLE) AS aic)"
+
+    def _models_view(self, dataset: str) -> str:
+        names = [path.rsplit(".", 1)[1] for path in self.models if path.rsplit(".", 1)[0] == dataset]
+        if not names:
+            return "(SELECT NULL::VARCHAR AS model_name WHERE FALSE)"
+        return "(SELECT * FROM (VALUES " + ", ".join(f"('{n}')" for n in names) + ") AS t(model_name))"
+
+    def get_model(self, model_ref, **kwargs) -> SimpleNamespace:
+        path = str(model_ref)
+        model = self._model(path)
+        return SimpleNamespace(
+            path=path,
+            model_id=path.rsplit(".", 1)[1],
+            etag=f"local-{id(model):x}",
+            labels=dict(self._model_labels[path]),
+            training_runs=[{"trainingOptions": {"horizon": str(model.horizon),
+                                                "dataFrequency": model.data_frequency}}],
+        )
+
+    def update_model(self, model: SimpleNamespace, fields, **kwargs) -> SimpleNamespace:
+        if "labels" in fields:
+            with self._ddl_lock:
+                self._model_labels[model.path] = dict(model.labels or {})
+        return model
+
+    def list_models(self, dataset, **kwargs):
+        dataset = str(dataset)
+        paths = [path for path in self.models if path.rsplit(".", 1)[0] == dataset]
+        return [SimpleNamespace(model_id=path.rsplit(".", 1)[1]) for path in paths]
+
+
+@contextmanager
+def injected_client(client: DuckDBClient):
+    """Make every `bigquery.Client(...)` created inside the block return `client`."""
+    original = bigquery.Client
+    bigquery.Client = lambda *args, **kwargs: client
+    try:
+        yield client
+    finally:
+        bigquery.Client = original
+
+
+# ============================
+# Pluggable forecasters
+# ============================
+# Weekly seasonality, in steps of the series' inferred frequency
+WEEKLY_SEASON = {"D": 7, "h": 168, "H": 168}
+
+
+class SeasonalNaiveForecaster:
+    """
+    y[t] = y[t - season]; a fast, deterministic stand-in for ARIMA_PLUS.
+    `season=None` uses a weekly season at the series' frequency (7 daily, 168 hourly).
+    """
+
+    n_params = 1
+
+    def __init__(self, season: Optional[int] = None, z: float = 1.96) -> None:
+        self.season = season
+        self.z = z
+
+    def fit(self, timestamps: pd.Series, values: pd.Series) -> "SeasonalNaiveForecaster":
+        y = np.asarray(values, dtype="float64")
+        self._last_ts = pd.Timestamp(pd.to_datetime(timestamps).iloc[-1])
+        self._freq = pd.infer_freq(pd.to_datetime(timestamps).iloc[-min(len(y), 30):]) or "D"
+        self._season = self.season or WEEKLY_SEASON.get(self._freq, 7)
+        if len(y) <= self._season:
+            raise ValueError(f"Need more than {self._season} observations to fit.")
+        self._history = y[-self._season:]
+        residuals = y[self._season:] - y[:-self._season]
+        self._sse = float(np.sum(residuals ** 2))
+        self._n = len(residuals)
+        self._sigma = float(np.std(residuals, ddof=1)) if self._n > 1 else 0.0
+        return self
+
+    @property
+    def aic(self) -> float:
+        # Gaussian log-likelihood AIC, comparable across local models on one series
+        return self._n * math.log(max(self._sse, 1e-12) / self._n) + 2 * self.n_params
+
+    def forecast(self, horizon: int) -> pd.DataFrame:
+        steps = np.arange(horizon)
+        values = self._history[steps % self._season]
+        # Error grows with the number of seasons ahead
+        std_err = self._sigma * np.sqrt(steps // self._season + 1)
+        timestamps = pd.date_range(self._last_ts, periods=horizon + 1, freq=self._freq)[1:]
+        return pd.DataFrame({
+            "forecast_timestamp": timestamps,
+            "forecast_value": values,
+            "standard_error": std_err,
+            "prediction_interval_lower_bound": values - self.z * std_err,
+            "prediction_interval_upper_bound": values + self.z * std_err,
+        })
+
+
+class MeanForecaster(SeasonalNaiveForecaster):
+    """Flat forecast at the training mean; a baseline to rank against."""
+
+    def fit(self, timestamps: pd.Series, values: pd.Series) -> "MeanForecaster":
+        y = np.asarray(values, dtype="float64")
+        self._mean = float(y.mean())
+        self._last_ts = pd.Timestamp(pd.to_datetime(timestamps).iloc[-1])
+        self._freq = pd.infer_freq(pd.to_datetime(timestamps).iloc[-min(len(y), 30):]) or "D"
+        residuals = y - self._mean
+        self._sse = float(np.sum(residuals ** 2))
+        self._n = len(y)
+        self._sigma = float(np.std(residuals, ddof=1)) if self._n > 1 else 0.0
+        return self
+
+    def forecast(self, horizon: int) -> pd.DataFrame:
+        values = np.full(horizon, self._mean)
+        std_err = np.full(horizon, self._sigma)
+        timestamps = pd.date_range(self._last_ts, periods=horizon + 1, freq=self._freq)[1:]
+        return pd.DataFrame({
+            "forecast_timestamp": timestamps,
+            "forecast_value": values,
+            "standard_error": std_err,
+            "prediction_interval_lower_bound": values - self.z * std_err,
+            "prediction_interval_upper_bound": values + self.z * std_err,
+        })
+
+
+FORECASTERS = {
+    "seasonal_naive": SeasonalNaiveForecaster,
+    "mean": MeanForecaster,
+}
+
+
+def make_forecaster(spec: str):
+    """Build a forecaster from a registry name or a `package.module:ClassName` path."""
+    if spec in FORECASTERS:
+        return FORECASTERS[spec]()
+    if ":" in spec:
+        module, name = spec.split(":", 1)
+        return getattr(importlib.import_module(module), name)()
+    raise ValueError(f"Unknown forecaster {spec!r}; choose from {sorted(FORECASTERS)} or module:Class")
+
+
+# ============================
+# Holdout metrics
+# ============================
+def holdout_error(model, test_df: pd.DataFrame, value_col: str = "total_trips") -> dict:
+    """MAE / MAPE of a fitted forecaster's forecast against held-out rows."""
+    fc = model.forecast(len(test_df))
+    actual = test_df[value_col].to_numpy(dtype="float64")
+    predicted = fc["forecast_value"].to_numpy()[: len(actual)]
+    abs_err = np.abs(actual - predicted)
+    return {
+        "mae": float(abs_err.mean()) if len(abs_err) else float("nan"),
+        "mape": float(np.mean(abs_err / np.where(actual == 0, np.nan, actual)) * 100) if len(abs_err) else float("nan"),
+    }
@@ -1,10 +1,75 @@
+import re
+from collections import OrderedDict
+from typing import List, Optional, Set
+
+import pandas as pd
+from google.api_core import exceptions as api_exceptions
 from google.cloud import bigquery
+from logic_components.query_executor import QueryExecutor
+
+
+MODEL_PATH_PATTERN = re.compile(r"^[A-Za-z0-9_\-]+\.[A-Za-z0-9_]+\.[A-Za-z0-9_]+$")
+
+
+def validate_model_paths(model_paths: List[str]) -> None:
+    for path in model_paths:
+        if not MODEL_PATH_PATTERN.match(path):
+            raise ValueError(f"model path must look like project.dataset.model: {path!r}")
+
+
+def existing_models(
+    client: bigquery.Client, model_paths: List[str], executor: Optional[QueryExecutor] = None
+) -> Set[str]:
+    """
+    Return the subset of model_paths that exist, using one catalog
+    (models.list) call per distinct dataset instead of a query. The calls run
+    under `executor`'s deadline and retry policy.
+    """
+    executor = executor or QueryExecutor(client)
+    by_dataset = OrderedDict()
+    for path in model_paths:
+        project, dataset, model = path.split(".")
+        by_dataset.setdefault(f"{project}.{dataset}", set()).add(model)
+
+    existing = set()
+    for dataset, models in by_dataset.items():
+        try:
+            listed = executor.call(
+                lambda remaining: {m.model_id for m in client.list_models(dataset, timeout=remaining, retry=None)}
+            )
+        except api_exceptions.NotFound:
+            continue
+        existing.update(f"{dataset}.{m}" for m in models & listed)
+    return existing
+
+
+def build_batch_evaluation_query(model_paths: List[str]) -> str:
+    """
+    Build one query that evaluates every model with a single UNION ALL over
+    ML.ARIMA_EVALUATE. All paths must exist; see existing_models().
+    """
+    validate_model_paths(model_paths)
+    if not model_paths:
+        raise ValueError("model_paths must contain at least one model.")
+
+    return "\n        UNION ALL\n".join(
+        f"""
+        SELECT '{path}' AS model, MIN(aic) AS aic
+        FROM ML.ARIMA_EVALUATE(MODEL `{path}`)"""
+        for path in model_paths
+    )
 
 
 class ModelEvaluator:
-    def __init__(self, project_id: str) -> None:
+    def __init__(self, project_id: str, timeout: float = 300.0) -> None:
         self.project_id = project_id
         self.client = bigquery.Client(project=project_id)
+        self.executor = QueryExecutor(self.client, timeout=timeout)
+
+    @property
+    def jobs(self) -> list:
+        """Finished warehouse jobs, for profiling."""
+        return self.executor.jobs
 
     def evaluate(self, model_path: str) -> dict:
         query = f"""
@@ -13,11 +78,7 @@ class ModelEvaluator:
         LIMIT 1
         """
 
-        df = (
-            self.client.query(query)
-            .result()
-            .to_dataframe()
-        )
+        df = self.executor.run(query).to_dataframe()
 
         if df.empty:
             raise RuntimeError(f"No evaluation results found for model: {model_path}")
@@ -28,3 +89,32 @@ class ModelEvaluator:
             "model": model_path,
             "aic": aic_value
         }
+
+    def evaluate_many(self, model_paths: List[str]) -> pd.DataFrame:
+        """
+        Evaluate several models in one job and return them ranked by AIC.
+
+        Existence is checked against the model catalog first, so the query
+        job only ever references models that exist. Columns: model,
+        model_exists, aic, rank (1 = best). Missing models are kept in the
+        table with model_exists=False and no rank.
+        """
+        model_paths = list(dict.fromkeys(model_paths))
+        if not model_paths:
+            raise ValueError("model_paths must contain at least one model.")
+
+        validate_model_paths(model_paths)
+
+        existing = existing_models(self.client, model_paths, self.executor)
+        evaluable = [path for path in model_paths if path in existing]
+        if evaluable:
+            evaluated = self.executor.run(build_batch_evaluation_query(evaluable)).to_dataframe()
+        else:
+            evaluated = pd.DataFrame(columns=["model", "aic"])
+
+        df = pd.DataFrame({"model": model_paths})
+        df["model_exists"] = df["model"].isin(existing)
+        df = df.merge(evaluated, on="model", how="left")
+        df["aic"] = df["aic"].astype("float64")
+        df["rank"] = df["aic"].rank(method="min").astype("Int64")
+        return df.sort_values(["rank", "model"], na_position="last").reset_index(drop=True)
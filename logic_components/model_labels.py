@@ -0,0 +1,21 @@
+import pandas as pd
+
+
+# BigQuery label values cannot hold ':' or spaces, so the `training_end`
+# label written by the trainers (and read by the serving API) uses these
+TRAINING_END_DATE_FORMAT = "%Y-%m-%d"
+TRAINING_END_TIMESTAMP_FORMAT = "%Y-%m-%dt%H-%M-%S"
+
+
+def format_training_end(value) -> str:
+    """Format the last training date / timestamp; midnight collapses to a bare date."""
+    value = pd.Timestamp(value)
+    if value == value.normalize():
+        return value.strftime(TRAINING_END_DATE_FORMAT)
+    return value.strftime(TRAINING_END_TIMESTAMP_FORMAT)
+
+
+def parse_training_end(label: str) -> pd.Timestamp:
+    """Read a `training_end` model label: YYYY-MM-DD or YYYY-MM-DDtHH-MM-SS."""
+    fmt = TRAINING_END_TIMESTAMP_FORMAT if "t" in label else TRAINING_END_DATE_FORMAT
+    return pd.Timestamp(pd.to_datetime(label, format=fmt))
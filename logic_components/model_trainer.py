@@ -1,12 +1,21 @@
 from typing import Optional
 from google.cloud import bigquery
+from logic_components.model_labels import format_training_end
+from logic_components.query_executor import QueryExecutor
 
 
 class BQMLTrainer:
-    def __init__(self, project_id: str, dataset_id: str) -> None:
+    def __init__(self, project_id: str, dataset_id: str, timeout: float = 3600.0) -> None:
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.client = bigquery.Client(project=self.project_id)
+        # CREATE OR REPLACE MODEL is safe to retry but must never be hedged
+        self.executor = QueryExecutor(self.client, timeout=timeout)
+
+    @property
+    def jobs(self) -> list:
+        """Finished warehouse jobs, for profiling."""
+        return self.executor.jobs
 
     # -----------------------------------------------------------
     # Utility: Full BigQuery model path
@@ -27,9 +36,13 @@ class BQMLTrainer:
         time_col: str = "trip_date",
         value_col: str = "total_trips",
         horizon: int = 30,
+        data_frequency: str = "AUTO_FREQUENCY",
     ) -> str:
         """
         Trains a default ARIMA_PLUS model using BigQuery ML.
+
+        `horizon` counts steps of `data_frequency` (e.g. 720 for 30 days of
+        HOURLY data).
         """
 
         full_model_path = self._full_model_path(model_name)
@@ -42,6 +55,7 @@ class BQMLTrainer:
             auto_arima = TRUE,
             time_series_timestamp_col = '{time_col}',
             time_series_data_col = '{value_col}',
+            data_frequency = '{data_frequency}',
             horizon = {horizon}
         ) AS
         SELECT
@@ -51,10 +65,33 @@ class BQMLTrainer:
         ORDER BY {time_col};
         """
 
-        job = self.client.query(query)
-        job.result()
+        self.executor.run(query)
+        self.label_training_end(full_model_path, full_table_path, time_col)
 
         print(f"[ModelTrainer] ARIMA_PLUS model trained on table: {source_table}")
         print(f"[ModelTrainer] Model created: {full_model_path}")
 
         return full_model_path
+
+    # -----------------------------------------------------------
+    # Record the training window on the model
+    # -----------------------------------------------------------
+    def label_training_end(self, full_model_path: str, full_table_path: str, time_col: str = "trip_date") -> None:
+        """
+        Stores the last training timestamp as the `training_end` model label;
+        the serving API derives the valid forecast window from it (see
+        model_labels for the format).
+        """
+        rows = list(self.executor.run(f"SELECT MAX({time_col}) AS max_date FROM `{full_table_path}`"))
+        max_date = rows[0]["max_date"] if rows else None
+        if max_date is None:
+            return
+        label = format_training_end(max_date)
+
+        model = self.executor.call(
+            lambda remaining: self.client.get_model(full_model_path, timeout=remaining, retry=None)
+        )
+        model.labels = {**(model.labels or {}), "training_end": label}
+        self.executor.call(
+            lambda remaining: self.client.update_model(model, ["labels"], timeout=remaining, retry=None)
+        )
@@ -0,0 +1,95 @@
+"""
+Compare pipeline step profiles (written by StepProfiler) between two runs.
+
+    python -m logic_components.profile_report baseline/ candidate/ --threshold 0.2
+
+Each run is a directory of profile JSON files (or a single file). Exits with
+status 1 when any phase time or job total regressed by more than `threshold`
+and by more than the metric's absolute floor (a zero baseline only has to
+clear the floor).
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+
+# Differences below these floors are treated as noise
+ABSOLUTE_FLOORS = {
+    "seconds": 0.5,
+    "total_bytes_processed": 10 * 2**20,
+    "total_bytes_billed": 10 * 2**20,
+    "slot_millis": 1000,
+    "elapsed_ms": 500,
+}
+
+
+def load_run(path: str) -> Dict[str, dict]:
+    files = [path]
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".json"))
+    run = {}
+    for file in files:
+        with open(file) as f:
+            profile = json.load(f)
+        run[profile["step"]] = profile
+    return run
+
+
+def flatten(profile: dict) -> Dict[str, float]:
+    values = {f"phase.{k}": v for k, v in profile.get("phases_seconds", {}).items()}
+    for k, v in profile.get("totals", {}).items():
+        if k != "jobs":
+            values[f"total.{k}"] = v
+    return values
+
+
+def _floor(metric: str) -> float:
+    if metric.startswith("phase.") or metric == "total.wall_seconds":
+        return ABSOLUTE_FLOORS["seconds"]
+    return ABSOLUTE_FLOORS.get(metric.split(".", 1)[1], 0.0)
+
+
+def compare(baseline: Dict[str, dict], candidate: Dict[str, dict], threshold: float) -> List[Tuple]:
+    """Return (step, metric, baseline, candidate, change, regressed) rows."""
+    rows = []
+    for step in sorted(set(baseline) | set(candidate)):
+        if step not in baseline or step not in candidate:
+            continue
+        base, cand = flatten(baseline[step]), flatten(candidate[step])
+        for metric in sorted(set(base) & set(cand)):
+            b, c = base[metric], cand[metric]
+            if b:
+                change = (c - b) / b
+            else:
+                # 0 -> N is an unbounded relative change; the absolute floor decides
+                change = float("inf") if c > 0 else 0.0
+            regressed = change > threshold and (c - b) > _floor(metric)
+            rows.append((step, metric, b, c, change, regressed))
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare pipeline step profiles between runs.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    rows = compare(load_run(args.baseline), load_run(args.candidate), args.threshold)
+    regressions = [r for r in rows if r[5]]
+
+    print(f"{'step':<32} {'metric':<36} {'baseline':>14} {'candidate':>14} {'change':>8}")
+    for step, metric, b, c, change, regressed in rows:
+        flag = "  REGRESSED" if regressed else ""
+        print(f"{step:<32} {metric:<36} {b:>14.3f} {c:>14.3f} {change:>+7.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterable, Optional
+
+
+# BigQuery job attributes collected per job (missing ones are skipped)
+JOB_STAT_FIELDS = ("total_bytes_processed", "total_bytes_billed", "slot_millis")
+
+
+def job_stats(job: Any) -> dict:
+    """Extract bytes, slot-ms and elapsed time from a finished BigQuery job."""
+    stats = {
+        "job_id": getattr(job, "job_id", None),
+        "job_type": getattr(job, "job_type", None),
+    }
+    for field in JOB_STAT_FIELDS:
+        value = getattr(job, field, None)
+        if value is not None:
+            stats[field] = int(value)
+    started, ended = getattr(job, "started", None), getattr(job, "ended", None)
+    if started is not None and ended is not None:
+        stats["elapsed_ms"] = int((ended - started).total_seconds() * 1000)
+    return stats
+
+
+class StepProfiler:
+    """
+    Times the phases of one pipeline step and collects warehouse job statistics.
+
+    The result is flat enough to log as KFP Metrics (`log_metrics`) and is also
+    written as a JSON profile (`write_json`) for `profile_report` to compare
+    across runs.
+    """
+
+    def __init__(self, step: str) -> None:
+        self.step = step
+        self.phases = OrderedDict()
+        self.jobs = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - started)
+
+    def record_jobs(self, jobs: Iterable[Any], phase: Optional[str] = None) -> None:
+        for job in jobs:
+            stats = job_stats(job)
+            stats["phase"] = phase
+            self.jobs.append(stats)
+
+    def totals(self) -> dict:
+        totals = {"wall_seconds": time.perf_counter() - self._started, "jobs": len(self.jobs)}
+        for field in JOB_STAT_FIELDS + ("elapsed_ms",):
+            totals[field] = sum(j.get(field, 0) for j in self.jobs)
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            "step": self.step,
+            "phases_seconds": dict(self.phases),
+            "totals": self.totals(),
+            "jobs": self.jobs,
+        }
+
+    def log_metrics(self, metrics: Any) -> None:
+        """Log phase timings and job totals on a KFP `Metrics` artifact."""
+        for name, seconds in self.phases.items():
+            metrics.log_metric(f"{name}_seconds", round(seconds, 3))
+        for name, value in self.totals().items():
+            metrics.log_metric(name, round(value, 3) if isinstance(value, float) else value)
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,263 @@
+import random
+import threading
+import time
+import concurrent.futures
+from collections import deque
+from typing import Any, Callable, List, Optional
+
+import requests
+from google.api_core import exceptions as api_exceptions
+
+
+# Errors worth retrying: throttling, backend hiccups and dropped connections.
+TRANSIENT_ERRORS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.GatewayTimeout,
+    ConnectionError,
+)
+
+# BigQuery reports some retryable conditions as 403/400 with these reasons.
+TRANSIENT_REASONS = {"rateLimitExceeded", "backendError", "internalError", "jobRateLimitExceeded"}
+
+
+class QueryTimeout(Exception):
+    """Raised when a job does not finish within its per-call deadline."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, TRANSIENT_ERRORS):
+        return True
+    for err in getattr(exc, "errors", None) or []:
+        if isinstance(err, dict) and err.get("reason") in TRANSIENT_REASONS:
+            return True
+    return False
+
+
+class LatencyTracker:
+    """Rolling window of job latencies, used to pick the hedging threshold."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, int(q * len(samples)))
+        return samples[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class QueryExecutor:
+    """
+    Runs BigQuery jobs with a per-call deadline, jittered retries on transient
+    errors and, for idempotent reads, an optional hedged duplicate.
+
+    `client` only needs `query(sql, job_config=..., job_retry=...)` returning an object with
+    `result(timeout=...)` and `cancel()`, so a fake client that injects latency
+    or faults can be passed in. `sleep` and `clock` are injectable for the same
+    reason.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        timeout: float = 300.0,
+        max_attempts: int = 3,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        hedge_after: Optional[float] = None,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        latency: Optional[LatencyTracker] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = latency if latency is not None else LatencyTracker()
+        self._sleep = sleep
+        self._clock = clock
+        # Finished jobs, in completion order (job statistics live on these)
+        self.jobs: List[Any] = []
+        self.stats = {"attempts": 0, "retries": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0}
+
+    # -----------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------
+    def run(
+        self,
+        query: str,
+        job_config: Any = None,
+        timeout: Optional[float] = None,
+        retry: bool = True,
+        hedge: bool = False,
+    ):
+        """Run a query and return its row iterator (`job.result()`)."""
+        # job_retry=None: retries happen here, under our deadline, not again inside the client
+        submit = lambda: self.client.query(query, job_config=job_config, job_retry=None)  # noqa: E731
+        return self.execute(submit, timeout=timeout, retry=retry, hedge=hedge)
+
+    def to_dataframe(self, query: str, **kwargs):
+        return self.run(query, **kwargs).to_dataframe()
+
+    def execute(
+        self,
+        submit: Callable[[], Any],
+        timeout: Optional[float] = None,
+        retry: bool = True,
+        hedge: bool = False,
+    ):
+        """
+        Submit a job via `submit()` and wait for it, retrying transient failures
+        until `timeout` seconds have elapsed in total. `hedge=True` must only be
+        used for idempotent reads since two copies of the job may run.
+        """
+        run = self._run_hedged if hedge else self._run_once
+        return self._with_retries(lambda remaining: run(submit, remaining), timeout, retry)
+
+    def call(
+        self,
+        fn: Callable[[float], Any],
+        timeout: Optional[float] = None,
+        retry: bool = True,
+    ):
+        """
+        Make a synchronous API call that is not a job (model catalog reads and
+        updates) under the same deadline and retry policy as `execute`.
+        `fn(remaining)` gets the seconds left and must pass them on as the
+        call's own `timeout=`, with the client's built-in retry disabled.
+        """
+        return self._with_retries(lambda remaining: self._call_once(fn, remaining), timeout, retry)
+
+    def _with_retries(self, attempt_fn: Callable[[float], Any], timeout: Optional[float], retry: bool):
+        budget = self.timeout if timeout is None else timeout
+        deadline = self._clock() + budget
+        attempts = self.max_attempts if retry else 1
+        last_exc: Optional[BaseException] = None
+
+        for attempt in range(attempts):
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                break
+            self.stats["attempts"] += 1
+            try:
+                return attempt_fn(remaining)
+            except QueryTimeout:
+                # The deadline covers the whole call, so a timed-out attempt ends it
+                raise
+            except Exception as exc:
+                if not is_transient(exc) or attempt == attempts - 1:
+                    raise
+                last_exc = exc
+                self.stats["retries"] += 1
+                backoff = random.uniform(0, min(self.max_backoff, self.initial_backoff * (2 ** attempt)))
+                self._sleep(max(0.0, min(backoff, deadline - self._clock())))
+
+        raise QueryTimeout(f"Job did not complete within {budget}s (last error: {last_exc})")
+
+    def hedge_threshold(self) -> Optional[float]:
+        if self.hedge_after is not None:
+            return self.hedge_after
+        if len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.quantile(self.hedge_quantile)
+
+    # -----------------------------------------------------------
+    # Internals
+    # -----------------------------------------------------------
+    def _finish(self, job: Any, started: float, rows: Any):
+        self.latency.record(self._clock() - started)
+        self.jobs.append(job)
+        return rows
+
+    def _cancel(self, job: Any) -> None:
+        try:
+            job.cancel()
+        except Exception:
+            pass
+
+    def _call_once(self, fn: Callable[[float], Any], timeout: float):
+        try:
+            return fn(timeout)
+        except (concurrent.futures.TimeoutError, TimeoutError, requests.exceptions.Timeout):
+            self.stats["timeouts"] += 1
+            raise QueryTimeout(f"Call did not complete within {timeout:.1f}s")
+
+    def _run_once(self, submit: Callable[[], Any], timeout: float):
+        started = self._clock()
+        job = submit()
+        try:
+            rows = job.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            self.stats["timeouts"] += 1
+            self._cancel(job)
+            raise QueryTimeout(f"Job did not complete within {timeout:.1f}s")
+        return self._finish(job, started, rows)
+
+    def _run_hedged(self, submit: Callable[[], Any], timeout: float):
+        threshold = self.hedge_threshold()
+        if threshold is None or threshold >= timeout:
+            return self._run_once(submit, timeout)
+
+        started = self._clock()
+        primary = submit()
+        try:
+            return self._finish(primary, started, primary.result(timeout=threshold))
+        except concurrent.futures.TimeoutError:
+            pass
+
+        # Primary is slower than usual: race a duplicate against it
+        self.stats["hedges"] += 1
+        secondary = submit()
+        jobs = {primary: "primary", secondary: "hedge"}
+        remaining = timeout - (self._clock() - started)
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        try:
+            futures = {pool.submit(job.result, timeout=remaining): job for job in jobs}
+            pending = set(futures)
+            first_exc: Optional[BaseException] = None
+            while pending:
+                remaining = timeout - (self._clock() - started)
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=max(0.0, remaining), return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for fut in done:
+                    exc = fut.exception()
+                    if exc is None:
+                        winner = futures[fut]
+                        if jobs[winner] == "hedge":
+                            self.stats["hedge_wins"] += 1
+                        for job in jobs:
+                            if job is not winner:
+                                self._cancel(job)
+                        return self._finish(winner, started, fut.result())
+                    if first_exc is None and not isinstance(exc, concurrent.futures.TimeoutError):
+                        first_exc = exc
+            for job in jobs:
+                self._cancel(job)
+            if first_exc is not None:
+                raise first_exc
+            self.stats["timeouts"] += 1
+            raise QueryTimeout(f"Job did not complete within {timeout:.1f}s (hedged)")
+        finally:
+            pool.shutdown(wait=False)
@@ -0,0 +1,18 @@
+import os
+from kfp import compiler
+from pipelines.pip.batch_evaluation_pipeline_v2 import batch_evaluation_pipeline_v2
+
+
+if __name__ == "__main__":
+    output_path = os.path.join(
+        os.path.dirname(__file__),
+        "specs",
+        "batch_evaluation_pipeline_v2.json",
+    )
+
+    compiler.Compiler().compile(
+        pipeline_func=batch_evaluation_pipeline_v2,
+        package_path=output_path,
+    )
+
+    print(f"Pipeline compiled successfully → {output_path}")
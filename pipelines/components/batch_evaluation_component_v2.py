@@ -0,0 +1,54 @@
+from kfp import dsl
+from kfp.dsl import Artifact, Dataset, Metrics, Output
+from pipelines.components.component_image import COMPONENT_IMAGE
+
+
+@dsl.component(
+    base_image=COMPONENT_IMAGE,
+    packages_to_install=["google-cloud-bigquery", "pandas", "pyarrow", "db-dtypes"],
+)
+def batch_evaluation_component_v2(
+    project_id: str,
+    model_paths: list,
+    ranking: Output[Dataset],
+    metrics: Output[Metrics],
+    profile: Output[Artifact],
+) -> str:
+    """
+    Evaluate a list of BQML ARIMA models in a single BigQuery job, write the
+    AIC ranking (CSV) to the `ranking` artifact and return the best model path.
+    """
+    import traceback
+
+    try:
+        # COMPONENT_IMAGE ships the logic_components package
+        from logic_components.model_evaluate import ModelEvaluator
+        from logic_components.profiling import StepProfiler
+
+        profiler = StepProfiler("batch_evaluation")
+
+        evaluator = ModelEvaluator(project_id=project_id)
+        print(f"[BatchEval] Evaluating {len(model_paths)} models in one job")
+        with profiler.phase("evaluate"):
+            df = evaluator.evaluate_many(model_paths=model_paths)
+        profiler.record_jobs(evaluator.jobs, phase="evaluate")
+        print(df.to_string(index=False))
+
+        df.to_csv(ranking.path, index=False)
+
+        ranked = df[df["model_exists"] & df["aic"].notna()]
+        if ranked.empty:
+            raise RuntimeError(f"None of the candidate models could be evaluated: {model_paths}")
+        best_model = str(ranked["model"].iloc[0])
+        print(f"[BatchEval] Best model: {best_model} (AIC: {float(ranked['aic'].iloc[0])})")
+
+        profiler.log_metrics(metrics)
+        metrics.log_metric("models_evaluated", int(df["aic"].notna().sum()))
+        metrics.log_metric("best_aic", float(ranked["aic"].iloc[0]))
+        profiler.write_json(profile.path)
+        return best_model
+    except Exception:
+        # Print stacktrace to logs for debug; re-raise so pipeline fails clearly
+        print("[BatchEval] Error during evaluation:")
+        traceback.print_exc()
+        raise
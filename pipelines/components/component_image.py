@@ -0,0 +1,13 @@
+import os
+
+
+# Container the pipeline components run in. It is built from the repository
+# root so the project's logic_components package (loaders, trainers, the
+# QueryExecutor and StepProfiler) is importable inside every step:
+#   docker build -f pipelines/Dockerfile -t <image> .
+#   docker push <image>
+# Set COMPONENT_IMAGE to the pushed tag before compiling the pipeline.
+COMPONENT_IMAGE = os.getenv(
+    "COMPONENT_IMAGE",
+    "gcr.io/ml-ai-portfolio/taxi-forecasting-components:latest",
+)
@@ -1,10 +1,12 @@
 from kfp import dsl
+from kfp.dsl import Artifact, Metrics, Output
+from pipelines.components.component_image import COMPONENT_IMAGE
 from typing import Tuple
 
 
 
 @dsl.component(
-    base_image="python:3.10",
+    base_image=COMPONENT_IMAGE,
     packages_to_install=[
         "google-cloud-bigquery", "pandas", "db-dtypes"
     ],
@@ -16,62 +18,50 @@ def data_loader_component_v2(
     train_table: str,
     test_table: str,
     cutoff_date: str,
+    metrics: Output[Metrics],
+    profile: Output[Artifact],
+    time_column: str = "trip_date",
+    data_frequency: str = "DAILY",
+    aggregate_from: str = "",
 ) -> str:
+    """
+    Load the source series, split it at cutoff_date and write train/test tables.
 
-    # Try to import DataLoader from the project's logic_components package; if not present at runtime,
-    # fall back to an inline minimal implementation so the component can run in Vertex AI's container.
-    try:
-        from logic_components.data_loader import DataLoader
-    except Exception:
-        # Local inline fallback DataLoader class definition (minimal implementation)
-        import pandas as pd
-        from google.cloud import bigquery
+    data_frequency is DAILY or HOURLY. When aggregate_from names the event
+    timestamp column of a raw trips table, trips are counted per period in
+    BigQuery and only the aggregated series is downloaded.
+    """
 
-        class DataLoader:
-            def __init__(self, project_id: str, dataset_id: str, table_id: str, date_column: str = "trip_date") -> None:
-                self.project_id = project_id
-                self.dataset_id = dataset_id
-                self.table_id = table_id
-                self.date_column = date_column
+    # COMPONENT_IMAGE ships the logic_components package
+    from logic_components.data_loader import DataLoader
+    from logic_components.profiling import StepProfiler
 
-            def load_data(self) -> pd.DataFrame:
-                client = bigquery.Client(project=self.project_id)
-                table_ref = f"{self.project_id}.{self.dataset_id}.{self.table_id}"
-                query = f"""
-                    SELECT *
-                    FROM `{table_ref}`
-                    ORDER BY {self.date_column}
-                """
-                df = client.query(query).to_dataframe()
-                return df
-
-            def train_test_split(self, df: pd.DataFrame, train_end_date: str):
-                df = df.copy()
-                df[self.date_column] = pd.to_datetime(df[self.date_column])
-                train_cutoff = pd.to_datetime(train_end_date)
-                train_df = df[df[self.date_column] <= train_cutoff].copy()
-                test_df = df[df[self.date_column] > train_cutoff].copy()
-                return train_df, test_df
-
-            def save_to_bigquery(self, df: pd.DataFrame, target_table: str, write_disposition: str = "WRITE_TRUNCATE") -> None:
-                client = bigquery.Client(project=self.project_id)
-                table_id = f"{self.project_id}.{self.dataset_id}.{target_table}"
-                job_config = bigquery.LoadJobConfig(write_disposition=write_disposition)
-                load_job = client.load_table_from_dataframe(df, table_id, job_config=job_config)
-                load_job.result()
+    profiler = StepProfiler("data_loader")
 
     loader = DataLoader(
         project_id=project_id,
         dataset_id=dataset_id,
         table_id=source_table,
+        date_column=time_column,
+        data_frequency=data_frequency,
     )
 
-    df = loader.load_data()
-    train_df, test_df = loader.train_test_split(df, cutoff_date)
-    loader.save_to_bigquery(train_df, train_table)
-    loader.save_to_bigquery(test_df, test_table)
+    with profiler.phase("load"):
+        df = loader.load_data(aggregate_from=aggregate_from or None)
+    with profiler.phase("split"):
+        train_df, test_df = loader.train_test_split(df, cutoff_date)
+    with profiler.phase("upload_train"):
+        loader.save_to_bigquery(train_df, train_table)
+    with profiler.phase("upload_test"):
+        loader.save_to_bigquery(test_df, test_table)
 
     print(f"Train rows: {len(train_df)}, Test rows: {len(test_df)}")
 
+    profiler.record_jobs(loader.jobs)
+    profiler.log_metrics(metrics)
+    metrics.log_metric("train_rows", len(train_df))
+    metrics.log_metric("test_rows", len(test_df))
+    profiler.write_json(profile.path)
+
     return train_table
 
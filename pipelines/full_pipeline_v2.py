@@ -16,7 +16,14 @@ def full_pipeline_v2(
     test_table: str = 'test_2022',
     model_name: str = 'daily_arima_default_model_v1',
     cutoff_date: str = '2022-11-01',
+    time_column: str = 'trip_date',
+    data_frequency: str = 'DAILY',
+    horizon: int = 30,
+    aggregate_from: str = '',
 ):
+    # Hourly run: data_frequency='HOURLY', horizon=720 (30 days), and a source
+    # table of hourly totals, or a raw trips table with aggregate_from set to
+    # its pickup timestamp column.
     # Step 1: load
     load_task = data_loader_component_v2(
         project_id=project_id,
@@ -25,6 +32,9 @@ def full_pipeline_v2(
         train_table=train_table,
         test_table=test_table,
         cutoff_date=cutoff_date,
+        time_column=time_column,
+        data_frequency=data_frequency,
+        aggregate_from=aggregate_from,
     )
 
     # Step 2: train
@@ -33,11 +43,14 @@ def full_pipeline_v2(
         dataset_id=dataset_id,
         source_table=train_table,
         model_name=model_name,
+        time_column=time_column,
+        data_frequency=data_frequency,
+        horizon=horizon,
     ).after(load_task)
 
     # Step 3: eval
     eval_task = evaluation_component_v2(
         project_id=project_id,
-        model_path=train_task.output,
+        model_path=train_task.outputs["Output"],
     ).after(train_task)
 
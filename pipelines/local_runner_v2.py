@@ -0,0 +1,266 @@
+"""
+Run full_pipeline_v2 in-process against a local DuckDB warehouse.
+
+Calls the pipeline's own component functions (load -> train -> evaluate, then
+batch evaluation to rank), with stub output artifacts and every
+`bigquery.Client` they create replaced by a DuckDB-backed client; BQML
+ARIMA_PLUS is replaced by a pluggable local forecaster. Steps whose inputs are
+ready run concurrently, including one train/evaluate branch per candidate
+forecaster.
+
+    python -m pipelines.local_runner_v2 --synthetic-days 1095
+    python -m pipelines.local_runner_v2 --synthetic-days 1095 --data-frequency HOURLY
+    python -m pipelines.local_runner_v2 --source-csv aggregated_daily_2022.csv \\
+        --forecasters seasonal_naive,mean,my_pkg.models:Holt
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from google.cloud import bigquery
+
+from logic_components.local_backend import DuckDBClient, holdout_error, injected_client
+from pipelines.components.batch_evaluation_component_v2 import batch_evaluation_component_v2
+from pipelines.components.data_loader_component_v2 import data_loader_component_v2
+from pipelines.components.evaluation_component_v2 import evaluation_component_v2
+from pipelines.components.train_arima_default_component_v2 import train_arima_default_component_v2
+
+
+Step = Tuple[Callable[..., Any], List[str]]
+
+
+def run_dag(steps: Dict[str, Step], max_workers: int = 4) -> Dict[str, Any]:
+    """
+    Execute `{name: (fn, deps)}`; each fn receives its deps' results as keyword
+    arguments and starts as soon as all of them have finished.
+    """
+    results: Dict[str, Any] = {}
+    pending = dict(steps)
+    running: Dict[concurrent.futures.Future, str] = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            ready = [name for name, (_, deps) in pending.items() if all(d in results for d in deps)]
+            for name in ready:
+                fn, deps = pending.pop(name)
+                running[pool.submit(fn, **{d: results[d] for d in deps})] = name
+            if not running:
+                raise RuntimeError(f"Unsatisfiable dependencies: {sorted(pending)}")
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in done:
+                results[running.pop(fut)] = fut.result()
+    return results
+
+
+def synthetic_daily_trips(days: int, start: str = "2020-01-01") -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    idx = np.arange(days)
+    trips = 90_000 + 15_000 * np.sin(idx * 2 * np.pi / 7) + 20 * idx + rng.normal(0, 3_000, days)
+    return pd.DataFrame({
+        "trip_date": pd.date_range(start, periods=days, freq="D"),
+        "total_trips": trips.round().astype("int64"),
+    })
+
+
+def synthetic_hourly_trips(days: int, start: str = "2020-01-01", time_column: str = "trip_hour") -> pd.DataFrame:
+    """Same weekly pattern as `synthetic_daily_trips` with an intraday peak; 24 rows per day."""
+    rng = np.random.default_rng(42)
+    hours = days * 24
+    idx = np.arange(hours)
+    trips = (
+        3_750
+        + 625 * np.sin(idx * 2 * np.pi / 168)
+        + 2_000 * np.sin((idx % 24 - 6) * 2 * np.pi / 24)
+        + idx / 1.2
+        + rng.normal(0, 300, hours)
+    )
+    return pd.DataFrame({
+        time_column: pd.date_range(start, periods=hours, freq="h"),
+        "total_trips": trips.clip(0).round().astype("int64"),
+    })
+
+
+class LocalArtifact:
+    """Stand-in for a KFP Output[...] artifact: a local file path plus logged metrics."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.metadata: Dict[str, Any] = {}
+
+    def log_metric(self, metric: str, value: Any) -> None:
+        self.metadata[metric] = value
+
+
+def run_local_pipeline(
+    source_df: pd.DataFrame,
+    cutoff_date: str,
+    forecasters: List[str],
+    project_id: str = "local",
+    dataset_id: str = "taxi_forecasting",
+    source_table: str = "aggregated_daily_2022",
+    train_table: str = "train_2022",
+    test_table: str = "test_2022",
+    model_name: str = "daily_arima_default_model_v1",
+    database: str = ":memory:",
+    max_workers: int = 4,
+    time_column: str = "trip_date",
+    data_frequency: str = "DAILY",
+    horizon: int = 30,
+    artifacts_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run the pipeline's components (their `python_func`) against DuckDB.
+
+    The steps are data_loader_component_v2, then one train_arima_default /
+    evaluation component branch per candidate forecaster, then
+    batch_evaluation_component_v2 to rank the trained models. Component
+    outputs (metrics, profiles, the ranking CSV) are written under
+    `artifacts_dir`, a temporary directory by default.
+    """
+    client = DuckDBClient(database, project=project_id)
+    dataset = f"{project_id}.{dataset_id}"
+    step_seconds: Dict[str, float] = {}
+    artifacts: Dict[str, Dict[str, LocalArtifact]] = {}
+
+    def outputs(step: str, *names: str) -> List[LocalArtifact]:
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", step)
+        artifacts[step] = {name: LocalArtifact(os.path.join(artifacts_dir, f"{safe}.{name}")) for name in names}
+        return list(artifacts[step].values())
+
+    def timed_step(step: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        def wrapper(**kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(**kwargs)
+            finally:
+                step_seconds[step] = time.perf_counter() - started
+        return wrapper
+
+    def load():
+        metrics, profile = outputs("load", "metrics", "profile")
+        return data_loader_component_v2.python_func(
+            project_id=project_id, dataset_id=dataset_id, source_table=source_table,
+            train_table=train_table, test_table=test_table, cutoff_date=cutoff_date,
+            metrics=metrics, profile=profile, time_column=time_column, data_frequency=data_frequency,
+        )
+
+    steps: Dict[str, Step] = {"load": (timed_step("load", load), [])}
+
+    def branch(forecaster: str) -> str:
+        name = f"{model_name}__{forecaster.replace(':', '_').replace('.', '_')}"
+        client.model_forecasters[f"{dataset}.{name}"] = forecaster
+        train_step, eval_step = f"train[{forecaster}]", f"evaluate[{forecaster}]"
+
+        def train(load):
+            metrics, profile = outputs(train_step, "metrics", "profile")
+            return train_arima_default_component_v2.python_func(
+                project_id=project_id, dataset_id=dataset_id, source_table=train_table, model_name=name,
+                metrics=metrics, profile=profile, time_column=time_column,
+                data_frequency=data_frequency, horizon=horizon,
+            )
+
+        def evaluate(model_path):
+            metrics, profile = outputs(eval_step, "metrics", "profile")
+            aic = evaluation_component_v2.python_func(
+                project_id=project_id, model_path=model_path, metrics=metrics, profile=profile,
+            )
+            test_df = client.table(f"{dataset}.{test_table}")
+            return {"model": model_path, "aic": aic, **holdout_error(client.models[model_path], test_df)}
+
+        steps[train_step] = (timed_step(train_step, train), ["load"])
+        steps[eval_step] = (timed_step(eval_step, lambda **kw: evaluate(kw[train_step])), [train_step])
+        return eval_step
+
+    eval_steps = [branch(f) for f in forecasters]
+
+    def rank(**evaluations):
+        ranking, metrics, profile = outputs("rank", "ranking", "metrics", "profile")
+        return batch_evaluation_component_v2.python_func(
+            project_id=project_id, model_paths=[evaluations[s]["model"] for s in eval_steps],
+            ranking=ranking, metrics=metrics, profile=profile,
+        )
+
+    steps["rank"] = (timed_step("rank", rank), eval_steps)
+
+    with contextlib.ExitStack() as stack:
+        if artifacts_dir is None:
+            artifacts_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="local_runner_v2_"))
+        os.makedirs(artifacts_dir, exist_ok=True)
+        stack.enter_context(injected_client(client))
+
+        client.load_table_from_dataframe(
+            source_df, f"{dataset}.{source_table}",
+            job_config=bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE"),
+        )
+        started = time.perf_counter()
+        results = run_dag(steps, max_workers=max_workers)
+        wall = time.perf_counter() - started
+
+        ranking = pd.read_csv(artifacts["rank"]["ranking"].path)
+        profiles = {}
+        for step, outs in artifacts.items():
+            with open(outs["profile"].path) as f:
+                profiles[step] = json.load(f)
+
+    load_metrics = artifacts["load"]["metrics"].metadata
+    return {
+        "train_rows": load_metrics["train_rows"],
+        "test_rows": load_metrics["test_rows"],
+        "evaluations": [results[s] for s in eval_steps],
+        "ranking": ranking.to_dict("records"),
+        "best_model": results["rank"],
+        "wall_seconds": round(wall, 3),
+        "phases_seconds": {step: round(seconds, 4) for step, seconds in step_seconds.items()},
+        "profiles": profiles,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run full_pipeline_v2 locally against DuckDB.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--source-csv", help="CSV with <time-column>,total_trips columns")
+    source.add_argument("--synthetic-days", type=int, default=1095)
+    parser.add_argument("--data-frequency", choices=["DAILY", "HOURLY"], default="DAILY")
+    parser.add_argument("--time-column", help="defaults to trip_date (DAILY) or trip_hour (HOURLY)")
+    parser.add_argument("--horizon", type=int, help="steps to forecast; defaults to 30 days at the data frequency")
+    parser.add_argument("--cutoff-date", default="2022-11-01")
+    parser.add_argument("--forecasters", default="seasonal_naive,mean",
+                        help="comma-separated registry names or module:Class paths")
+    parser.add_argument("--database", default=":memory:", help="DuckDB file to keep tables between runs")
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--artifacts-dir", help="keep component outputs (metrics, profiles, ranking) here")
+    args = parser.parse_args()
+
+    hourly = args.data_frequency == "HOURLY"
+    time_column = args.time_column or ("trip_hour" if hourly else "trip_date")
+    if args.source_csv:
+        source_df = pd.read_csv(args.source_csv, parse_dates=[time_column])
+    elif hourly:
+        source_df = synthetic_hourly_trips(args.synthetic_days, time_column=time_column)
+    else:
+        source_df = synthetic_daily_trips(args.synthetic_days).rename(columns={"trip_date": time_column})
+
+    report = run_local_pipeline(
+        source_df,
+        cutoff_date=args.cutoff_date,
+        forecasters=[f.strip() for f in args.forecasters.split(",") if f.strip()],
+        database=args.database,
+        max_workers=args.max_workers,
+        time_column=time_column,
+        data_frequency=args.data_frequency,
+        horizon=args.horizon or (720 if hourly else 30),
+        artifacts_dir=args.artifacts_dir,
+    )
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
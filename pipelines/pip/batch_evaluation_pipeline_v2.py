@@ -0,0 +1,18 @@
+from kfp import dsl
+from pipelines.components.batch_evaluation_component_v2 import batch_evaluation_component_v2
+
+
+@dsl.pipeline(
+    name="batch-evaluate-arima-models-aic-pipeline-v2",
+    description="Rank several BigQuery ARIMA models by AIC in one job (KFP v2)",
+)
+def batch_evaluation_pipeline_v2(
+    project_id: str = "ml-ai-portfolio",
+    model_paths: list = [
+        "ml-ai-portfolio.taxi_forecasting.daily_arima_default_model_v1",
+    ],
+):
+    _ = batch_evaluation_component_v2(
+        project_id=project_id,
+        model_paths=model_paths,
+    )
@@ -13,6 +13,9 @@ def data_loader_pipeline_v2(
     train_table: str = "train_2022",
     test_table: str = "test_2022",
     cutoff_date: str = "2022-11-01",
+    time_column: str = "trip_date",
+    data_frequency: str = "DAILY",
+    aggregate_from: str = "",
 ):
     _ = data_loader_component_v2(
         project_id=project_id,
@@ -21,5 +24,8 @@ def data_loader_pipeline_v2(
         train_table=train_table,
         test_table=test_table,
         cutoff_date=cutoff_date,
+        time_column=time_column,
+        data_frequency=data_frequency,
+        aggregate_from=aggregate_from,
     )
 
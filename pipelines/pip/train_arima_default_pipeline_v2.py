@@ -11,11 +11,17 @@ def train_arima_default_pipeline_v2(
     dataset_id: str = "taxi_forecasting",
     source_table: str = "train_2022",
     model_name: str = "daily_arima_default_model_v1",
+    time_column: str = "trip_date",
+    data_frequency: str = "DAILY",
+    horizon: int = 30,
 ):
     _ = train_arima_default_component_v2(
         project_id=project_id,
         dataset_id=dataset_id,
         source_table=source_table,
         model_name=model_name,
+        time_column=time_column,
+        data_frequency=data_frequency,
+        horizon=horizon,
     )
 
@@ -0,0 +1,145 @@
+"""AdmissionController shedding and its mapping to HTTP responses."""
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from google.api_core import exceptions as api_exceptions
+
+from admission import AdmissionController, AdmissionRejected
+from benchmarks.bench_api_load import load_app
+from logic_components.query_executor import QueryTimeout
+
+
+def hold_slot(controller: AdmissionController):
+    """Occupy one slot on a background thread until the returned event is set."""
+    entered, release = threading.Event(), threading.Event()
+
+    def worker():
+        with controller.slot():
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert entered.wait(5)
+    return release, thread
+
+
+def test_request_beyond_the_queue_is_shed_with_429():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=0, queue_timeout=1, retry_after=7)
+    release, thread = hold_slot(controller)
+    try:
+        with pytest.raises(AdmissionRejected) as rejected:
+            with controller.slot():
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+    assert rejected.value.status_code == 429
+    assert rejected.value.retry_after == 7
+    assert rejected.value.endpoint == "test"
+
+
+def test_queued_request_past_its_deadline_is_shed_with_503():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    release, thread = hold_slot(controller)
+    started = time.monotonic()
+    try:
+        with pytest.raises(AdmissionRejected) as rejected:
+            with controller.slot():
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+    assert rejected.value.status_code == 503
+    assert 0.05 <= time.monotonic() - started < 1
+
+
+def test_queued_request_is_admitted_when_a_slot_frees_up():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=1, queue_timeout=5)
+    release, thread = hold_slot(controller)
+    threading.Timer(0.05, release.set).start()
+
+    with controller.slot():
+        assert controller.stats()["in_flight"] == 1
+    thread.join()
+
+
+def test_stats_count_admitted_queued_and_shed_requests():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=1, queue_timeout=0.2)
+    release, thread = hold_slot(controller)
+
+    with pytest.raises(AdmissionRejected):  # waits in the queue, then times out
+        with controller.slot():
+            pass
+
+    def wait_for_slot():
+        with controller.slot():
+            pass
+
+    waiter = threading.Thread(target=wait_for_slot)
+    waiter.start()
+    while controller.stats()["queued"] == 0:
+        time.sleep(0.001)
+    with pytest.raises(AdmissionRejected):  # the queue is full
+        with controller.slot():
+            pass
+    release.set()
+    thread.join()
+    waiter.join()
+
+    assert controller.stats() == {
+        "max_concurrent": 1,
+        "max_queue": 1,
+        "queue_timeout": 0.2,
+        "in_flight": 0,
+        "queued": 0,
+        "admitted": 2,
+        "queued_total": 2,
+        "shed_queue_full": 1,
+        "shed_timeout": 1,
+    }
+
+
+def test_rejections_carry_retry_after():
+    main = load_app()
+    client = TestClient(main.app)
+    release, thread = hold_slot(main.retrain_admission)
+    try:
+        response = client.post("/api/retrain", json={"model_name": "m", "source_table": "trips"})
+    finally:
+        release.set()
+        thread.join()
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(main.retrain_admission.retry_after)
+    assert response.json()["endpoint"] == "retrain"
+
+
+@pytest.mark.parametrize("exc", [
+    QueryTimeout("ML.FORECAST did not finish within 60s"),
+    api_exceptions.TooManyRequests("quota exceeded"),
+    api_exceptions.Forbidden("exceeded", errors=[{"reason": "rateLimitExceeded"}]),
+    ConnectionError("reset by peer"),
+])
+def test_warehouse_saturation_is_shed_with_503(exc):
+    main = load_app()
+    controller = AdmissionController("forecast", max_concurrent=1, max_queue=0, queue_timeout=0, retry_after=3)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        main._shed_if_warehouse_saturated(exc, controller)
+
+    assert rejected.value.status_code == 503
+    assert rejected.value.retry_after == 3
+    assert rejected.value.__cause__ is exc
+
+
+@pytest.mark.parametrize("exc", [ValueError("bad start_date"), api_exceptions.NotFound("no such model")])
+def test_other_errors_are_not_shed(exc):
+    main = load_app()
+    controller = AdmissionController("forecast", max_concurrent=1, max_queue=0, queue_timeout=0)
+
+    main._shed_if_warehouse_saturated(exc, controller)
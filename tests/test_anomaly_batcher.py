@@ -0,0 +1,60 @@
+"""MicroBatcher timeouts and the /anomalies 504 path."""
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from anomaly_batcher import MicroBatcher
+
+
+class BlockingScorer:
+    """Scores item -> item * 2, holding every batch until `release` is set."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.scored = []
+
+    def __call__(self, items):
+        self.release.wait(5)
+        self.scored.extend(items)
+        return [item * 2 for item in items]
+
+
+def make_batcher(scorer) -> MicroBatcher:
+    return MicroBatcher(scorer, max_batch_size=10, max_wait_seconds=0.01, max_in_flight=1)
+
+
+def test_items_from_a_timed_out_request_are_never_scored():
+    scorer = BlockingScorer()
+    batcher = make_batcher(scorer)
+    first = concurrent.futures.ThreadPoolExecutor(1).submit(batcher.submit, [1], 5)
+    time.sleep(0.1)  # the only scoring slot is now busy with [1]
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        batcher.submit([2, 3], timeout=0.05)
+    assert batcher.stats()["queued"] == 0
+    assert batcher.stats()["abandoned_items"] == 2
+
+    scorer.release.set()
+    assert first.result(5) == [2]
+    assert batcher.submit([4], timeout=5) == [8]
+    assert scorer.scored == [1, 4]
+
+
+def test_anomalies_times_out_with_504(monkeypatch):
+    from benchmarks.bench_api_load import load_app
+    from fastapi.testclient import TestClient
+
+    main = load_app()
+    scorer = BlockingScorer()
+    monkeypatch.setattr(main, "anomaly_batcher", make_batcher(scorer))
+    monkeypatch.setattr(main, "ANOMALY_REQUEST_TIMEOUT_SECONDS", 0.05)
+    try:
+        response = TestClient(main.app).post(
+            "/api/anomalies", json={"observations": [{"timestamp": "2022-11-01T00:00:00", "value": 1.0}]},
+        )
+    finally:
+        scorer.release.set()
+
+    assert response.status_code == 504
@@ -0,0 +1,134 @@
+"""Status codes and HTTP caching of the forecast endpoints."""
+import concurrent.futures
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.bench_api_load import load_app
+from benchmarks.fake_bigquery import patch_bigquery
+
+# The fake model was trained through 2022-10-31 with a 30-day horizon
+IN_WINDOW = {"start_date": "2022-11-01", "horizon": 30}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("MOCK_FORECAST", "false")
+    with patch_bigquery():
+        yield TestClient(load_app().app)
+
+
+@pytest.mark.parametrize("params", [
+    {"start_date": "2023-01-01", "horizon": 7},
+    {"start_date": "2022-11-20", "horizon": 30},
+])
+def test_out_of_window_requests_are_rejected_with_422(client, params):
+    post = client.post("/api/forecast", json=params)
+    get = client.get("/api/forecast", params=params)
+
+    for response in (post, get):
+        assert response.status_code == 422
+        assert "forecast window" in response.json()["error"] or "horizon" in response.json()["error"]
+        assert response.json()["data"] == []
+    assert get.headers["cache-control"] == "no-store"
+    assert "etag" not in get.headers
+
+
+def test_in_window_request_is_served(client):
+    post = client.post("/api/forecast", json=IN_WINDOW)
+    get = client.get("/api/forecast", params=IN_WINDOW)
+
+    assert post.status_code == get.status_code == 200
+    assert len(post.json()["data"]) == 30
+    assert get.headers["etag"]
+
+
+def test_mock_mode_rejects_long_horizons_with_422(client, monkeypatch):
+    monkeypatch.setenv("MOCK_FORECAST", "true")
+    response = client.post("/api/forecast", json={"start_date": "2022-11-01", "horizon": 31})
+
+    assert response.status_code == 422
+
+
+def test_etag_is_derived_from_model_version_and_parameters():
+    main = load_app()
+    etag = main._forecast_etag("v1", "2022-11-01", 30, "day")
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == main._forecast_etag("v1", "2022-11-01", 30, "day")
+    assert etag != main._forecast_etag("v2", "2022-11-01", 30, "day")
+    assert etag != main._forecast_etag("v1", "2022-11-02", 30, "day")
+    assert etag != main._forecast_etag("v1", "2022-11-01", 29, "day")
+    assert etag != main._forecast_etag("v1", "2022-11-01", 30, "week")
+
+
+def test_matching_if_none_match_returns_304(client):
+    etag = client.get("/api/forecast", params=IN_WINDOW).headers["etag"]
+    strong = etag[2:]
+
+    for header in (etag, strong, '"other", ' + etag, "*"):
+        response = client.get("/api/forecast", params=IN_WINDOW, headers={"If-None-Match": header})
+        assert response.status_code == 304, header
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"].startswith("private, max-age=")
+        assert response.content == b""
+
+    response = client.get("/api/forecast", params=IN_WINDOW, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_successful_responses_are_cacheable_and_errors_are_not(client, monkeypatch):
+    ok = client.get("/api/forecast", params=IN_WINDOW)
+    assert ok.headers["cache-control"].startswith("private, max-age=")
+    assert ok.headers["cache-control"].endswith("must-revalidate")
+
+    main = load_app()
+
+    def fail():
+        raise RuntimeError("catalog unavailable")
+
+    monkeypatch.setattr(main, "_get_model_version", fail)
+    error = client.get("/api/forecast", params=IN_WINDOW)
+    assert error.status_code == 200
+    assert error.json()["error"] == "catalog unavailable"
+    assert error.headers["cache-control"] == "no-store"
+    assert "etag" not in error.headers
+
+
+def test_only_responses_above_1kib_are_gzipped(client):
+    large = client.get("/api/forecast", params=IN_WINDOW, headers={"Accept-Encoding": "gzip"})
+    small = client.get("/api/forecast", params={"start_date": "2023-01-01", "horizon": 7},
+                       headers={"Accept-Encoding": "gzip"})
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert len(large.content) > 1024
+    assert "content-encoding" not in small.headers
+
+
+def test_model_version_refresh_is_single_flight_and_lock_free(monkeypatch):
+    main = load_app()
+    monkeypatch.setenv("MOCK_FORECAST", "false")
+    monkeypatch.setattr(main, "_model_version_cache", {"version": None, "fetched_at": 0.0, "inflight": None})
+    calls = []
+    release = threading.Event()
+
+    def slow_model_version(self):
+        calls.append(1)
+        release.wait(5)
+        return "v7"
+
+    monkeypatch.setattr(main.ForecastCore, "model_version", slow_model_version)
+    with patch_bigquery(), concurrent.futures.ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(main._get_model_version) for _ in range(4)]
+        time.sleep(0.1)
+        # The lock is free while the catalog call is outstanding
+        assert main._model_version_lock.acquire(timeout=1)
+        main._model_version_lock.release()
+        release.set()
+        versions = [f.result(timeout=5) for f in futures]
+
+    assert versions == ["v7"] * 4
+    assert len(calls) == 1
+    assert main._model_version_cache["inflight"] is None
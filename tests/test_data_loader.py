@@ -0,0 +1,70 @@
+"""DataLoader loading and train_test_split across the NumPy and Arrow dtype backends."""
+import datetime
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_bigquery import TRIPS_PER_PERIOD, FakeClient, table_frame
+from logic_components.data_loader import DataLoader
+
+CUTOFF = "2015-01-10"
+
+
+def loader(**kwargs) -> DataLoader:
+    return DataLoader("p", "d", "t", client=FakeClient(table_rows=30), **kwargs)
+
+
+@pytest.mark.parametrize("dtype_backend", ["numpy", "pyarrow"])
+def test_daily_split_keeps_cutoff_day_in_train(dtype_backend):
+    dl = loader()
+    df = dl.load_data(dtype_backend=dtype_backend)
+    train, test = dl.train_test_split(df, CUTOFF)
+
+    assert (len(train), len(test)) == (10, 20)
+    assert train[dl.date_column].dtype == df[dl.date_column].dtype
+
+
+def test_arrow_date32_column():
+    dates = [datetime.date(2015, 1, 1) + datetime.timedelta(days=i) for i in range(30)]
+    df = pd.DataFrame({"trip_date": pd.array(dates, dtype="date32[pyarrow]"), "total_trips": range(30)})
+    train, test = loader().train_test_split(df, CUTOFF)
+
+    assert (len(train), len(test)) == (10, 20)
+    assert str(train["trip_date"].dtype) == "date32[day][pyarrow]"
+
+
+def test_arrow_date32_unsorted_falls_back_to_mask():
+    dates = [datetime.date(2015, 1, 1) + datetime.timedelta(days=i) for i in range(30)][::-1]
+    df = pd.DataFrame({"trip_date": pd.array(dates, dtype="date32[pyarrow]"), "total_trips": range(30)})
+    train, test = loader().train_test_split(df, CUTOFF)
+
+    assert (len(train), len(test)) == (10, 20)
+
+
+@pytest.mark.parametrize("dtype_backend", ["numpy", "pyarrow"])
+def test_hourly_utc_timestamps_with_bare_date_cutoff(dtype_backend):
+    df = table_frame(24 * 30, freq="h")
+    df["trip_date"] = df["trip_date"].dt.tz_localize("UTC")
+    if dtype_backend == "pyarrow":
+        df = df.convert_dtypes(dtype_backend="pyarrow")
+    train, test = loader(data_frequency="HOURLY").train_test_split(df, CUTOFF)
+
+    assert (len(train), len(test)) == (24 * 10, 24 * 20)
+
+
+@pytest.mark.parametrize("data_frequency, part, periods", [("DAILY", "DAY", 30), ("HOURLY", "HOUR", 24 * 30)])
+@pytest.mark.parametrize("dtype_backend", ["numpy", "pyarrow"])
+def test_load_data_aggregates_raw_events_in_the_warehouse(data_frequency, part, periods, dtype_backend):
+    client = FakeClient(table_rows=periods, data_frequency=data_frequency)
+    dl = DataLoader("p", "d", "trips", client=client, data_frequency=data_frequency)
+    df = dl.load_data(dtype_backend=dtype_backend, aggregate_from="pickup_datetime")
+
+    assert "TIMESTAMP_TRUNC(pickup_datetime, " + part + ") AS trip_date" in client.queries[-1]
+    assert "GROUP BY 1" in client.queries[-1]
+    assert list(df.columns) == ["trip_date", "total_trips"]
+    assert len(df) == periods
+    assert int(df["total_trips"].sum()) == periods * TRIPS_PER_PERIOD
+    assert df["trip_date"].is_monotonic_increasing
+
+    train, test = dl.train_test_split(df, CUTOFF)
+    assert len(train) == periods // 3
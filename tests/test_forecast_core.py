@@ -0,0 +1,243 @@
+"""ForecastCore caching and query building against the fake BigQuery client."""
+import collections
+import concurrent.futures
+import datetime
+import re
+import threading
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_bigquery import FakeClient, FakeJob, patch_bigquery
+from forecast_core import FREQUENCY_STEPS, ForecastCore, rollup_forecast
+
+MODEL = "p.d.daily_model"
+
+
+@pytest.fixture(autouse=True)
+def empty_caches(monkeypatch):
+    monkeypatch.setattr(ForecastCore, "_daily_cache", collections.OrderedDict())
+    monkeypatch.setattr(ForecastCore, "_daily_inflight", {})
+    monkeypatch.setattr(ForecastCore, "_rollup_cache", collections.OrderedDict())
+    monkeypatch.setattr(ForecastCore, "_window_cache", collections.OrderedDict())
+    monkeypatch.setattr(ForecastCore, "_columns_cache", collections.OrderedDict())
+
+
+def forecast_queries(client):
+    return [q for q in client.queries if "ML.FORECAST" in q]
+
+
+def test_concurrent_cold_misses_run_one_forecast_query():
+    client = FakeClient(latency=0.2)
+    with patch_bigquery(lambda *args, **kwargs: client):
+        cores = [ForecastCore(MODEL, "p") for _ in range(8)]
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            frames = list(pool.map(lambda core: core.cached_forecast("v1", horizon=30), cores))
+
+    assert len(forecast_queries(client)) == 1
+    assert all(frame is frames[0] for frame in frames)
+    assert ForecastCore._daily_inflight == {}
+
+
+def test_leader_failure_reaches_waiters_and_is_not_cached(monkeypatch):
+    client = FakeClient()
+    started, release = threading.Event(), threading.Event()
+    fetch = ForecastCore._fetch_forecast
+
+    def failing_fetch(self, horizon):
+        started.set()
+        release.wait(5)
+        raise RuntimeError("warehouse down")
+
+    with patch_bigquery(lambda *args, **kwargs: client):
+        monkeypatch.setattr(ForecastCore, "_fetch_forecast", failing_fetch)
+        with concurrent.futures.ThreadPoolExecutor(2) as pool:
+            leader = pool.submit(ForecastCore(MODEL, "p").cached_forecast, "v1", 30)
+            started.wait(5)
+            waiter = pool.submit(ForecastCore(MODEL, "p").cached_forecast, "v1", 30)
+            release.set()
+            for fut in (leader, waiter):
+                with pytest.raises(RuntimeError, match="warehouse down"):
+                    fut.result(5)
+
+        monkeypatch.setattr(ForecastCore, "_fetch_forecast", fetch)
+        assert ForecastCore._daily_inflight == {}
+        assert len(ForecastCore(MODEL, "p").cached_forecast("v1", horizon=30)) == 30
+    assert len(forecast_queries(client)) == 1
+
+
+class HourlyColumnsClient(FakeClient):
+    """A model trained on (pickup_hour, trips); ML.DETECT_ANOMALIES echoes its input."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.catalog_reads = 0
+
+    def get_model(self, model_ref, **kwargs):
+        self.catalog_reads += 1
+        model = super().get_model(model_ref, **kwargs)
+        model.training_runs[0]["trainingOptions"].update(
+            timeSeriesTimestampColumn="pickup_hour", timeSeriesDataColumn="trips")
+        return model
+
+    def query(self, query, job_config=None, **kwargs):
+        if "ML.DETECT_ANOMALIES" not in query:
+            return super().query(query, job_config=job_config, **kwargs)
+        with self._lock:
+            self.queries.append(query)
+        rows = re.findall(r"TIMESTAMP '([^']+)' AS pickup_hour, ([\d.]+) AS trips", query)
+        df = pd.DataFrame({
+            "pickup_hour": pd.to_datetime([ts for ts, _ in rows], utc=True),
+            "trips": [float(v) for _, v in rows],
+            "is_anomaly": [float(v) > 100 for _, v in rows],
+            "lower_bound": 0.0,
+            "upper_bound": 100.0,
+            "anomaly_probability": [0.99 if float(v) > 100 else 0.1 for _, v in rows],
+        })
+        return FakeJob(df, 0.0, None)
+
+
+def test_detect_anomalies_uses_the_models_training_columns():
+    client = HourlyColumnsClient()
+    observations = [(datetime.datetime(2022, 11, 1, 5), 150.0), (datetime.datetime(2022, 11, 1, 6), 20.0)]
+    with patch_bigquery(lambda *args, **kwargs: client):
+        core = ForecastCore(MODEL, "p")
+        core.forecast_window("v1")
+        results = core.detect_anomalies(observations, model_version="v1")
+        core.detect_anomalies(observations, model_version="v1")
+
+    query = [q for q in client.queries if "ML.DETECT_ANOMALIES" in q][0]
+    assert "AS pickup_hour" in query and "AS trips" in query
+    assert "trip_date" not in query
+    assert [r["is_anomaly"] for r in results] == [True, False]
+    # Columns come from the catalog read forecast_window already made
+    assert client.catalog_reads == 1
+
+
+def test_series_columns_default_when_not_reported():
+    client = FakeClient()
+    with patch_bigquery(lambda *args, **kwargs: client):
+        model = client.get_model(MODEL)
+        model.training_runs[0]["trainingOptions"].pop("timeSeriesTimestampColumn")
+        client.get_model = lambda *args, **kwargs: model
+        assert ForecastCore(MODEL, "p").series_columns("v1") == ("trip_date", "total_trips")
+
+
+def forecast_frame(start, periods, freq="D"):
+    values = [float(v) for v in range(1, periods + 1)]
+    return pd.DataFrame({
+        "forecast_timestamp": pd.date_range(start, periods=periods, freq=freq),
+        "forecast_value": values,
+        "prediction_interval_lower_bound": [v - 1 for v in values],
+        "prediction_interval_upper_bound": [v + 1 for v in values],
+    })
+
+
+def test_weekly_rollup_runs_monday_to_sunday_and_flags_partial_weeks():
+    # Wednesday 2022-11-02 through Tuesday 2022-11-15
+    weeks = rollup_forecast(forecast_frame("2022-11-02", 14), "week")
+
+    assert [(w["date"], w["period_end"]) for w in weeks] == [
+        ("2022-10-31", "2022-11-06"), ("2022-11-07", "2022-11-13"), ("2022-11-14", "2022-11-20"),
+    ]
+    assert [w["days"] for w in weeks] == [5, 7, 2]
+    assert [w["complete"] for w in weeks] == [False, True, False]
+    assert [w["forecast"] for w in weeks] == [15.0, 63.0, 27.0]
+    # Interval bounds are summed, not combined in quadrature
+    assert [(w["lower_bound"], w["upper_bound"]) for w in weeks] == [(10.0, 20.0), (56.0, 70.0), (25.0, 29.0)]
+
+
+def test_monthly_rollup_is_complete_only_when_every_day_is_present():
+    full, = rollup_forecast(forecast_frame("2022-11-01", 30), "month")
+    partial = rollup_forecast(forecast_frame("2022-11-20", 15), "month")
+
+    assert (full["date"], full["period_end"], full["days"], full["complete"]) == ("2022-11-01", "2022-11-30", 30, True)
+    assert full["forecast"] == sum(range(1, 31))
+    assert [(m["date"], m["days"], m["complete"]) for m in partial] == [
+        ("2022-11-01", 11, False), ("2022-12-01", 4, False),
+    ]
+
+
+def test_hourly_rollup_counts_days_and_expects_every_hour():
+    frame = forecast_frame("2022-11-07 00:00", 7 * 24, freq="h")
+    week, = rollup_forecast(frame, "week", FREQUENCY_STEPS["HOURLY"])
+    short, = rollup_forecast(frame.iloc[:48], "week", FREQUENCY_STEPS["HOURLY"])
+
+    assert (week["days"], week["complete"]) == (7, True)
+    assert (short["days"], short["complete"]) == (2, False)
+
+
+def test_empty_frame_rolls_up_to_nothing():
+    assert rollup_forecast(forecast_frame("2022-11-01", 0), "week") == []
+
+
+def test_memoized_rollup_reports_the_same_query_stats():
+    with patch_bigquery():
+        first = ForecastCore(MODEL, "p")
+        cold = first.rollup("2022-11-01", 14, "week", model_version="v1")
+        second = ForecastCore(MODEL, "p")
+        warm = second.rollup("2022-11-01", 14, "week", model_version="v1")
+
+    assert warm is cold
+    assert second.last_query_stats == first.last_query_stats
+    assert second.last_query_stats["filtered_count"] == 14
+    assert second.last_query_stats["original_count"] > 0
+    assert second.last_query_stats["min_timestamp"] is not None
+
+
+def test_hourly_forecast_window_comes_from_model_metadata():
+    client = FakeClient(data_frequency="HOURLY", model_horizon=720)
+    with patch_bigquery(lambda *args, **kwargs: client):
+        window = ForecastCore("p.d.hourly_model", "p").forecast_window("v1")
+
+    # training_end is 2022-10-31t23-00-00, so the first forecast hour is midnight
+    assert window == {
+        "start_date": "2022-11-01T00:00:00",
+        "end_date": "2022-11-30T23:00:00",
+        "max_horizon": 720,
+        "data_frequency": "HOURLY",
+        "source": "model_labels",
+    }
+    assert not forecast_queries(client)
+
+
+DAILY_WINDOW = {"start_date": "2022-11-01", "end_date": "2022-11-30", "data_frequency": "DAILY"}
+HOURLY_WINDOW = {"start_date": "2022-11-01T00:00:00", "end_date": "2022-11-30T23:00:00", "data_frequency": "HOURLY"}
+
+
+@pytest.mark.parametrize("start_date, horizon, window, parsed", [
+    ("2022-11-01", 30, DAILY_WINDOW, "2022-11-01"),
+    ("2022-11-30", 1, DAILY_WINDOW, "2022-11-30"),
+    ("2022-11-05T13:45", 1, DAILY_WINDOW, "2022-11-05"),
+    ("2022-11-01T05:59:59", 715, HOURLY_WINDOW, "2022-11-01 05:00"),
+    ("2022-11-01T06:00:00+01:00", 1, HOURLY_WINDOW, "2022-11-01 05:00"),
+])
+def test_validate_inputs_floors_to_the_model_step(start_date, horizon, window, parsed):
+    with patch_bigquery():
+        assert ForecastCore(MODEL, "p")._validate_inputs(start_date, horizon, window) == pd.Timestamp(parsed)
+
+
+@pytest.mark.parametrize("start_date, horizon, window, message", [
+    ("2022-11-01", 0, DAILY_WINDOW, "positive integer"),
+    ("2022-11-01", "7", DAILY_WINDOW, "positive integer"),
+    ("11/01/2022", 7, DAILY_WINDOW, "format"),
+    ("2022-10-31", 7, DAILY_WINDOW, "forecast window"),
+    ("2022-12-01", 1, DAILY_WINDOW, "forecast window"),
+    ("2022-11-20", 12, DAILY_WINDOW, "at most 11"),
+    ("2022-11-30T12:00", 13, HOURLY_WINDOW, "at most 12"),
+])
+def test_validate_inputs_rejects_requests_outside_the_window(start_date, horizon, window, message):
+    with patch_bigquery():
+        with pytest.raises(ValueError, match=message):
+            ForecastCore(MODEL, "p")._validate_inputs(start_date, horizon, window)
+
+
+def test_forecast_output_is_dates_for_daily_and_seconds_for_hourly_models():
+    with patch_bigquery():
+        daily = ForecastCore(MODEL, "p").forecast("2022-11-01", 3, model_version="v1")
+    with patch_bigquery(data_frequency="HOURLY", model_horizon=720):
+        hourly = ForecastCore("p.d.hourly_model", "p").forecast("2022-11-01T22:00", 3, model_version="v1")
+
+    assert [p["date"] for p in daily] == ["2022-11-01", "2022-11-02", "2022-11-03"]
+    assert [p["date"] for p in hourly] == ["2022-11-01T22:00:00", "2022-11-01T23:00:00", "2022-11-02T00:00:00"]
+    assert all(isinstance(p["forecast"], float) for p in daily + hourly)
@@ -0,0 +1,99 @@
+"""Export encodings and the /forecast/export response headers."""
+import datetime
+import io
+import json
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.bench_api_load import load_app
+from forecast_export import EMPTY_FORECAST_SCHEMA, MEDIA_TYPES, STREAMERS
+
+
+def forecast_batches(rows=10, batch_size=4):
+    start = datetime.datetime(2022, 11, 1, tzinfo=datetime.timezone.utc)
+    table = pa.table({
+        "forecast_timestamp": pa.array([start + datetime.timedelta(days=i) for i in range(rows)],
+                                       pa.timestamp("us", tz="UTC")),
+        "forecast_value": pa.array([100.0 + i for i in range(rows)]),
+        "prediction_interval_lower_bound": pa.array([90.0 + i for i in range(rows)]),
+        "prediction_interval_upper_bound": pa.array([110.0 + i for i in range(rows)]),
+    })
+    return table, table.to_batches(max_chunksize=batch_size)
+
+
+def encode(fmt, batches) -> bytes:
+    return b"".join(STREAMERS[fmt](batches))
+
+
+def test_arrow_round_trip():
+    table, batches = forecast_batches()
+    assert pa.ipc.open_stream(encode("arrow", batches)).read_all().equals(table)
+
+
+def test_parquet_round_trip():
+    table, batches = forecast_batches()
+    data = encode("parquet", batches)
+
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.read().equals(table)
+    # One row group per incoming batch
+    assert parquet.num_row_groups == 3
+    assert parquet.metadata.row_group(0).column(1).compression == "ZSTD"
+
+
+def test_ndjson_round_trip():
+    table, batches = forecast_batches()
+    lines = encode("ndjson", batches).decode("utf-8").splitlines()
+
+    records = [json.loads(line) for line in lines]
+    assert len(records) == table.num_rows
+    assert [r["forecast_value"] for r in records] == table.column("forecast_value").to_pylist()
+    assert records[0]["forecast_timestamp"].startswith("2022-11-01T00:00:00")
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_empty_result_is_a_valid_file_with_the_forecast_schema(fmt):
+    data = encode(fmt, iter(()))
+
+    if fmt == "arrow":
+        table = pa.ipc.open_stream(data).read_all()
+    else:
+        table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 0
+    assert table.schema.equals(EMPTY_FORECAST_SCHEMA)
+
+
+def test_empty_ndjson_is_empty():
+    assert encode("ndjson", iter(())) == b""
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    monkeypatch.setenv("MOCK_FORECAST", "true")
+    return TestClient(load_app().app)
+
+
+@pytest.mark.parametrize("fmt, gzipped", [("ndjson", True), ("arrow", False), ("parquet", False)])
+def test_only_ndjson_exports_are_gzipped(mock_client, fmt, gzipped):
+    response = mock_client.get("/api/forecast/export", headers={"Accept-Encoding": "gzip"},
+                               params={"start_date": "2022-11-01", "horizon": 30, "format": fmt})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MEDIA_TYPES[fmt]
+    assert (response.headers.get("content-encoding") == "gzip") is gzipped
+    if fmt == "arrow":
+        assert pa.ipc.open_stream(response.content).read_all().num_rows == 30
+    elif fmt == "parquet":
+        assert pq.read_table(io.BytesIO(response.content)).num_rows == 30
+
+
+def test_mock_export_caps_the_horizon(mock_client):
+    main = load_app()
+    response = mock_client.get("/api/forecast/export",
+                               params={"start_date": "2022-11-01", "horizon": main.FORECAST_MAX_HORIZON + 1})
+
+    assert response.status_code == 422
+    assert "horizon" in response.json()["error"]
@@ -0,0 +1,71 @@
+"""DuckDBClient emulation of the BigQuery calls the pipeline components make."""
+import pandas as pd
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+pytest.importorskip("duckdb")
+
+from logic_components.local_backend import DuckDBClient, injected_client  # noqa: E402
+from logic_components.model_evaluate import ModelEvaluator  # noqa: E402
+from logic_components.model_trainer import BQMLTrainer  # noqa: E402
+
+DATASET = "local.taxi"
+
+
+def daily_trips(days: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "trip_date": pd.date_range("2020-01-01", periods=days, freq="D"),
+        "total_trips": [90_000 + 1_000 * (i % 7) + i for i in range(days)],
+    })
+
+
+@pytest.fixture
+def client():
+    client = DuckDBClient(project="local")
+    client.load_table_from_dataframe(daily_trips(120), f"{DATASET}.train")
+    return client
+
+
+def test_create_model_fits_the_requested_forecaster_and_labels_it(client):
+    client.model_forecasters[f"{DATASET}.m_mean"] = "mean"
+    with injected_client(client):
+        path = BQMLTrainer("local", "taxi").train_arima("train", "m_mean", horizon=14, data_frequency="DAILY")
+
+    assert type(client.models[path]).__name__ == "MeanForecaster"
+    model = client.get_model(path)
+    assert model.labels == {"training_end": "2020-04-29"}
+    assert model.training_runs[0]["trainingOptions"] == {"horizon": "14", "dataFrequency": "DAILY"}
+
+
+def test_arima_evaluate_and_catalog(client):
+    with injected_client(client):
+        trainer = BQMLTrainer("local", "taxi")
+        paths = [trainer.train_arima("train", name) for name in ("a", "b")]
+        ranking = ModelEvaluator("local").evaluate_many(paths + [f"{DATASET}.missing"])
+        aic = ModelEvaluator("local").evaluate(paths[0])["aic"]
+
+    assert sorted(m.model_id for m in client.list_models(DATASET)) == ["a", "b"]
+    assert ranking["model_exists"].tolist() == [True, True, False]
+    assert aic == pytest.approx(client.models[paths[0]].aic)
+    exists = client.query(f"SELECT COUNT(*) AS cnt FROM `{DATASET}.INFORMATION_SCHEMA.MODELS` WHERE model_name = 'a'")
+    assert int(exists.to_dataframe()["cnt"].iloc[0]) == 1
+
+
+def test_missing_model_is_not_found(client):
+    with pytest.raises(api_exceptions.NotFound):
+        client.get_model(f"{DATASET}.missing")
+    with pytest.raises(api_exceptions.NotFound):
+        client.query(f"SELECT aic FROM ML.ARIMA_EVALUATE(MODEL `{DATASET}.missing`)")
+
+
+def test_local_runner_drives_the_components():
+    pytest.importorskip("kfp")
+    from pipelines.local_runner_v2 import run_local_pipeline
+
+    report = run_local_pipeline(daily_trips(400), "2020-12-31", ["seasonal_naive", "mean"])
+
+    assert (report["train_rows"], report["test_rows"]) == (366, 34)
+    assert report["best_model"].endswith("__seasonal_naive")
+    assert set(report["profiles"]) == {"load", "train[seasonal_naive]", "train[mean]",
+                                       "evaluate[seasonal_naive]", "evaluate[mean]", "rank"}
+    assert report["profiles"]["load"]["totals"]["jobs"] == 3
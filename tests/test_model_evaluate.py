@@ -0,0 +1,50 @@
+"""ModelEvaluator.evaluate_many: catalog existence checks plus one ML.ARIMA_EVALUATE job."""
+import pytest
+
+from benchmarks.fake_bigquery import FakeClient, patch_bigquery
+from logic_components.model_evaluate import ModelEvaluator, build_batch_evaluation_query
+
+MODELS = ["p.models.arima_a", "p.models.arima_b"]
+
+
+def make_evaluator(client):
+    with patch_bigquery(lambda *args, **kwargs: client):
+        return ModelEvaluator("p")
+
+
+def test_existing_models_are_ranked_in_one_job():
+    client = FakeClient(models=MODELS)
+    df = make_evaluator(client).evaluate_many(list(reversed(MODELS)))
+
+    assert len(client.queries) == 1
+    assert client.queries[0].count("ML.ARIMA_EVALUATE") == 2
+    assert "INFORMATION_SCHEMA" not in client.queries[0]
+    assert df["model"].tolist() == MODELS
+    assert df["rank"].tolist() == [1, 2]
+
+
+def test_missing_models_are_reported_and_never_queried():
+    client = FakeClient(models=MODELS[:1])
+    df = make_evaluator(client).evaluate_many(MODELS + ["p.other_dataset.arima_c"])
+
+    assert "arima_b" not in client.queries[0]
+    assert df.set_index("model")["model_exists"].to_dict() == {
+        "p.models.arima_a": True,
+        "p.models.arima_b": False,
+        "p.other_dataset.arima_c": False,
+    }
+    assert df["aic"].notna().sum() == 1
+
+
+def test_no_job_when_nothing_exists():
+    client = FakeClient()
+    df = make_evaluator(client).evaluate_many(MODELS)
+
+    assert client.queries == []
+    assert not df["model_exists"].any()
+    assert df["rank"].isna().all()
+
+
+def test_invalid_model_path_is_rejected():
+    with pytest.raises(ValueError):
+        build_batch_evaluation_query(["not-a-model-path"])
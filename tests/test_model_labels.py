@@ -0,0 +1,67 @@
+"""The `training_end` label written by both trainers and read back by ForecastCore."""
+import datetime
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_bigquery import FakeClient, FakeJob, patch_bigquery
+from forecast_core import BQMLTrainer as ApiTrainer
+from logic_components.model_labels import format_training_end, parse_training_end
+from logic_components.model_trainer import BQMLTrainer as PipelineTrainer
+
+MAX_VALUES = [
+    datetime.date(2022, 10, 31),
+    datetime.datetime(2022, 10, 31, 0, 0, tzinfo=datetime.timezone.utc),
+    datetime.datetime(2022, 10, 31, 23, 0, tzinfo=datetime.timezone.utc),
+    pd.Timestamp("2022-10-31 05:30:15"),
+]
+
+
+class LabelRecordingClient(FakeClient):
+    def __init__(self, max_value, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.max_value = max_value
+        self.labels = None
+
+    def query(self, query, job_config=None, **kwargs):
+        if "MAX(" in query:
+            with self._lock:
+                self.queries.append(query)
+            return FakeJob(pd.DataFrame({"max_date": [self.max_value]}), 0.0, None)
+        return super().query(query, job_config=job_config, **kwargs)
+
+    def update_model(self, model, fields, **kwargs):
+        self.labels = dict(model.labels)
+        return model
+
+
+def expected(value) -> pd.Timestamp:
+    return pd.Timestamp(value).tz_localize(None) if pd.Timestamp(value).tzinfo else pd.Timestamp(value)
+
+
+@pytest.mark.parametrize("value", MAX_VALUES)
+def test_format_and_parse_round_trip(value):
+    label = format_training_end(value)
+
+    assert ":" not in label and " " not in label
+    assert parse_training_end(label) == expected(value)
+
+
+@pytest.mark.parametrize("value", MAX_VALUES)
+@pytest.mark.parametrize("trainer_class", [ApiTrainer, PipelineTrainer])
+def test_both_trainers_write_a_label_forecast_core_reads_back(trainer_class, value):
+    client = LabelRecordingClient(value)
+    with patch_bigquery(lambda *args, **kwargs: client):
+        trainer_class("p", "d").train_arima("trips", "model", time_col="trip_hour")
+
+    assert parse_training_end(client.labels["training_end"]) == expected(value)
+    assert len([q for q in client.queries if "MAX(" in q]) == 1
+
+
+def test_api_trainer_reuses_a_known_max_timestamp():
+    client = LabelRecordingClient(datetime.date(2022, 10, 31))
+    with patch_bigquery(lambda *args, **kwargs: client):
+        ApiTrainer("p", "d").train_arima("trips", "model", training_end=pd.Timestamp("2022-11-15 06:00"))
+
+    assert client.labels["training_end"] == "2022-11-15t06-00-00"
+    assert not [q for q in client.queries if "MAX(" in q]
@@ -0,0 +1,111 @@
+"""StepProfiler output and the profile_report regression check."""
+import datetime
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from logic_components import profile_report
+from logic_components.profiling import StepProfiler, job_stats
+
+
+def make_job(job_id="job_1", bytes_processed=2048, slot_millis=300, elapsed_ms=1500):
+    started = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    return SimpleNamespace(
+        job_id=job_id,
+        job_type="query",
+        total_bytes_processed=bytes_processed,
+        total_bytes_billed=None,
+        slot_millis=slot_millis,
+        started=started,
+        ended=started + datetime.timedelta(milliseconds=elapsed_ms),
+    )
+
+
+def profile(step="train", phases=None, **totals):
+    return {"step": step, "phases_seconds": phases or {}, "totals": {"jobs": 1, **totals}, "jobs": []}
+
+
+def test_job_stats_skips_missing_fields():
+    stats = job_stats(make_job())
+
+    assert stats == {
+        "job_id": "job_1",
+        "job_type": "query",
+        "total_bytes_processed": 2048,
+        "slot_millis": 300,
+        "elapsed_ms": 1500,
+    }
+    assert job_stats(SimpleNamespace()) == {"job_id": None, "job_type": None}
+
+
+def test_profiler_accumulates_phases_and_job_totals(tmp_path):
+    profiler = StepProfiler("train")
+    for _ in range(2):
+        with profiler.phase("train"):
+            pass
+    with pytest.raises(RuntimeError):
+        with profiler.phase("label"):
+            raise RuntimeError("failed phases are still timed")
+    profiler.record_jobs([make_job("a"), make_job("b", bytes_processed=1024)], phase="train")
+
+    totals = profiler.totals()
+    assert list(profiler.phases) == ["train", "label"]
+    assert totals["jobs"] == 2
+    assert totals["total_bytes_processed"] == 3072
+    assert totals["total_bytes_billed"] == 0
+    assert totals["elapsed_ms"] == 3000
+    assert [j["phase"] for j in profiler.jobs] == ["train", "train"]
+
+    path = tmp_path / "train.json"
+    profiler.write_json(str(path))
+    written = json.loads(path.read_text())
+    assert written["step"] == "train"
+    assert set(written["phases_seconds"]) == {"train", "label"}
+    assert profile_report.load_run(str(tmp_path)) == {"train": written}
+
+
+def test_profiler_logs_flat_metrics():
+    logged = {}
+    profiler = StepProfiler("load")
+    with profiler.phase("load"):
+        pass
+    profiler.record_jobs([make_job()])
+    profiler.log_metrics(SimpleNamespace(log_metric=logged.__setitem__))
+
+    assert {"load_seconds", "wall_seconds", "jobs", "slot_millis"} <= set(logged)
+    assert logged["jobs"] == 1
+
+
+def regressed(baseline, candidate, threshold=0.2):
+    rows = profile_report.compare({"train": baseline}, {"train": candidate}, threshold)
+    return {metric for _, metric, _, _, _, flag in rows if flag}
+
+
+def test_relative_regression_above_the_floor_is_flagged():
+    assert regressed(profile(phases={"train": 10.0}), profile(phases={"train": 13.0})) == {"phase.train"}
+    # +30% but only 0.3s: below the 0.5s floor
+    assert regressed(profile(phases={"train": 1.0}), profile(phases={"train": 1.3})) == set()
+    # +1s but only +10%
+    assert regressed(profile(phases={"train": 10.0}), profile(phases={"train": 11.0})) == set()
+
+
+def test_zero_baseline_is_judged_against_the_absolute_floor():
+    base = profile(phases={"split": 0.0}, total_bytes_processed=0, slot_millis=0)
+    cand = profile(phases={"split": 2.0}, total_bytes_processed=1024, slot_millis=5000)
+
+    rows = profile_report.compare({"train": base}, {"train": cand}, 0.2)
+
+    assert regressed(base, cand) == {"phase.split", "total.slot_millis"}
+    assert all(change == float("inf") for _, _, b, c, change, _ in rows if b == 0 and c > 0)
+    assert regressed(base, base) == set()
+
+
+def test_main_exits_1_on_regressions(tmp_path, capsys):
+    for run, seconds in (("baseline", 10.0), ("candidate", 20.0)):
+        (tmp_path / run).mkdir()
+        (tmp_path / run / "train.json").write_text(json.dumps(profile(phases={"train": seconds})))
+
+    assert profile_report.main([str(tmp_path / "baseline"), str(tmp_path / "candidate")]) == 1
+    assert "REGRESSED" in capsys.readouterr().out
+    assert profile_report.main([str(tmp_path / "baseline"), str(tmp_path / "baseline")]) == 0
@@ -0,0 +1,155 @@
+"""QueryExecutor retry, deadline and hedging behaviour against the fake BigQuery client."""
+import itertools
+import time
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from benchmarks.fake_bigquery import FakeClient
+from logic_components.query_executor import QueryExecutor, QueryTimeout
+
+QUERY = "SELECT * FROM `p.d.t` ORDER BY trip_date"
+
+
+class RecordingClient(FakeClient):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.kwargs = []
+        self.jobs = []
+
+    def query(self, query, job_config=None, **kwargs):
+        self.kwargs.append(kwargs)
+        job = super().query(query, job_config=job_config, **kwargs)
+        self.jobs.append(job)
+        return job
+
+
+def test_transient_error_is_retried_until_it_succeeds():
+    client = RecordingClient(fault_rate=1.0)
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        client.fault_rate = 0.0  # the backend recovers during the backoff
+
+    executor = QueryExecutor(client, timeout=5, max_attempts=3, sleep=sleep)
+    rows = executor.run(QUERY)
+
+    assert rows.total_rows == client.table_rows
+    assert executor.stats["attempts"] == 2
+    assert executor.stats["retries"] == 1
+    assert len(sleeps) == 1 and 0 <= sleeps[0] <= executor.initial_backoff
+    assert len(executor.jobs) == 1
+
+
+def test_retries_stop_after_max_attempts():
+    client = RecordingClient(fault_rate=1.0)
+    executor = QueryExecutor(client, timeout=5, max_attempts=3, sleep=lambda s: None)
+
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        executor.run(QUERY)
+    assert executor.stats["attempts"] == 3
+    assert len(client.jobs) == 3
+
+
+def test_retry_false_makes_a_single_attempt():
+    client = RecordingClient(fault_rate=1.0)
+    executor = QueryExecutor(client, timeout=5, max_attempts=3, sleep=lambda s: None)
+
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        executor.run(QUERY, retry=False)
+    assert len(client.jobs) == 1
+
+
+def test_non_transient_error_is_not_retried():
+    calls = []
+
+    def submit():
+        calls.append(1)
+        raise api_exceptions.BadRequest("syntax error")
+
+    executor = QueryExecutor(RecordingClient(), timeout=5, max_attempts=3, sleep=lambda s: None)
+    with pytest.raises(api_exceptions.BadRequest):
+        executor.execute(submit)
+    assert len(calls) == 1
+
+
+def test_client_level_job_retry_is_disabled():
+    client = RecordingClient()
+    QueryExecutor(client).run(QUERY)
+    assert client.kwargs == [{"job_retry": None}]
+
+
+def test_deadline_cancels_the_job_and_raises_query_timeout():
+    client = RecordingClient(latency=1.0)
+    executor = QueryExecutor(client, timeout=0.1, max_attempts=3)
+
+    started = time.monotonic()
+    with pytest.raises(QueryTimeout):
+        executor.run(QUERY)
+    assert time.monotonic() - started < 0.5
+    assert executor.stats["timeouts"] == 1
+    assert len(client.jobs) == 1 and client.jobs[0].cancelled
+    assert executor.jobs == []
+
+
+def test_slow_primary_is_hedged_and_the_duplicate_wins():
+    latencies = itertools.chain([2.0], itertools.repeat(0.01))
+    client = RecordingClient(latency=lambda: next(latencies))
+    executor = QueryExecutor(client, timeout=5, hedge_after=0.05)
+
+    started = time.monotonic()
+    executor.run(QUERY, hedge=True)
+    assert time.monotonic() - started < 1.0
+    assert executor.stats["hedges"] == 1
+    assert executor.stats["hedge_wins"] == 1
+    primary, hedge = client.jobs
+    assert primary.cancelled and not hedge.cancelled
+    assert executor.jobs == [hedge]
+
+
+def test_fast_primary_is_not_hedged():
+    client = RecordingClient(latency=0.0)
+    executor = QueryExecutor(client, timeout=5, hedge_after=0.5)
+
+    executor.run(QUERY, hedge=True)
+    assert executor.stats["hedges"] == 0
+    assert len(client.jobs) == 1
+
+
+def test_hedging_waits_for_enough_latency_samples():
+    executor = QueryExecutor(RecordingClient(), hedge_min_samples=5)
+    assert executor.hedge_threshold() is None
+    for seconds in (0.1, 0.2, 0.3, 0.4, 1.0):
+        executor.latency.record(seconds)
+    assert executor.hedge_threshold() == 1.0
+
+
+def test_catalog_calls_get_the_remaining_deadline_and_are_retried():
+    calls = []
+
+    def get_model(remaining):
+        calls.append(remaining)
+        if len(calls) == 1:
+            raise api_exceptions.ServiceUnavailable("backend error")
+        return "model"
+
+    executor = QueryExecutor(FakeClient(), timeout=60, max_attempts=3, sleep=lambda s: None)
+
+    assert executor.call(get_model, timeout=5) == "model"
+    assert len(calls) == 2
+    assert all(0 < remaining <= 5 for remaining in calls)
+    assert executor.stats["retries"] == 1
+    assert executor.jobs == []
+
+
+def test_catalog_call_timeout_becomes_query_timeout():
+    def get_model(remaining):
+        raise TimeoutError("read timed out")
+
+    executor = QueryExecutor(FakeClient(), timeout=5, max_attempts=3, sleep=lambda s: None)
+
+    with pytest.raises(QueryTimeout):
+        executor.call(get_model)
+    assert executor.stats["attempts"] == 1
+    assert executor.stats["timeouts"] == 1